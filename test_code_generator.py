@@ -0,0 +1,195 @@
+"""
+Tests for CodeGenerator against a local stub of LM Studio's chat completions API.
+
+Run with: python -m pytest -q
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ue_bridge import CodeGenerator, GenerationCache, GenerationKind, IncrementalJsonObject, extract_json
+from ue_bridge_bench import StubLMServer
+
+
+TRAITS = {'courage': 0.8, 'curiosity': 0.6}
+
+
+@pytest.fixture
+def stub():
+    with StubLMServer(latency=0.05) as server:
+        yield server
+
+
+def test_connections_are_reused(stub, tmp_path):
+    with CodeGenerator(stub.url) as generator:
+        generator.set_output_dir(tmp_path)
+        for i in range(8):
+            assert generator.generate_character_class(f'Npc{i}', TRAITS)['header_file']
+    
+    assert stub.requests == 8
+    assert stub.connections == 1
+    assert (tmp_path / 'Npc7.h').exists() and (tmp_path / 'Npc7.cpp').exists()
+
+
+def test_concurrency_is_capped(stub):
+    with CodeGenerator(stub.url, max_concurrency=2) as generator, ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: generator.generate_character_class(f'Npc{i}', TRAITS), range(8)))
+    
+    assert all(result['header_file'] for result in results)
+    assert stub.max_active == 2
+    assert stub.connections <= 2
+
+
+def test_async_generation(stub):
+    async def generate_all(generator):
+        return await asyncio.gather(*(generator.agenerate_character_class(f'Npc{i}', TRAITS) for i in range(6)))
+    
+    with CodeGenerator(stub.url, max_concurrency=3) as generator:
+        results = asyncio.run(generate_all(generator))
+    
+    assert [r['header_file'].count('class ANpc') for r in results] == [1] * 6
+    assert stub.max_active <= 3
+    assert stub.connections <= 3
+
+
+def test_failure_returns_empty_result():
+    with StubLMServer(latency=0.0, fail_rate=1.0) as stub, CodeGenerator(stub.url) as generator:
+        assert generator.generate_character_class('Npc', TRAITS) == {}
+
+
+def test_batch_in_flight_is_capped_by_max_concurrency(stub):
+    specs = [{'kind': 'character', 'name': f'Npc{i}', 'traits': TRAITS} for i in range(8)]
+    with CodeGenerator(stub.url, max_concurrency=2) as generator:
+        outcomes = list(generator.generate_batch(specs, max_in_flight=8))
+    
+    assert all(outcome['result'] for outcome in outcomes)
+    assert stub.max_active == 2
+
+
+STREAMED_REPLY = {'header_file': '#pragma once\n"quoted" \\ {brace}', 'count': 12, 'items': [1, {'a': '}'}],
+                  'enabled': True, 'missing': None, 'source_file': '#include "Npc.h"\n'}
+
+
+def test_incremental_json_at_every_split():
+    text = 'Sure!\n```json\n' + json.dumps(STREAMED_REPLY, indent=2) + '\n```'
+    for cut in range(len(text) + 1):
+        parser = IncrementalJsonObject()
+        members = parser.feed(text[:cut]) + parser.feed(text[cut:])
+        assert [key for key, _ in members] == list(STREAMED_REPLY), f"split at {cut}"
+        assert parser.result() == STREAMED_REPLY
+
+
+def test_incremental_json_reports_incomplete():
+    parser = IncrementalJsonObject()
+    assert parser.feed('{"header_file": "#pragma once", "source_file": "#inc') == [('header_file', '#pragma once')]
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_streaming_writes_header_before_source(tmp_path):
+    events = []
+    
+    def on_progress(event):
+        if event['field'] == 'header_file':
+            events.append(('header', (tmp_path / 'Npc.h').exists(), (tmp_path / 'Npc.cpp').exists()))
+        elif event['field'] == 'source_file':
+            events.append(('source', True, (tmp_path / 'Npc.cpp').exists()))
+    
+    with StubLMServer(latency=0.2) as stub, CodeGenerator(stub.url) as generator:
+        generator.set_output_dir(tmp_path)
+        result = generator.generate_character_class('Npc', TRAITS, stream=True, on_progress=on_progress)
+    
+    assert events == [('header', True, False), ('source', True, True)]
+    assert (tmp_path / 'Npc.h').read_text() == result['header_file']
+
+
+@pytest.mark.parametrize('text', [
+    '{"header_file": "A", "source_file": "B"}',
+    'Here is the code:\n```json\n{"header_file": "A", "source_file": "B"}\n```\nEnjoy!',
+    'For {Npc}: {"header_file": "A", "source_file": "B"} as requested.',
+])
+def test_extract_json_variants(text):
+    assert extract_json(text) == {'header_file': 'A', 'source_file': 'B'}
+
+
+def test_extract_json_accepts_raw_newlines_and_rejects_prose():
+    assert extract_json('{"header_file": "line 1\nline 2"}') == {'header_file': 'line 1\nline 2'}
+    with pytest.raises(ValueError):
+        extract_json('No code today {sorry')
+
+
+class FencedStub(StubLMServer):
+    """Wraps every reply in a ```json fence with a line of preamble, like chatty models do."""
+    
+    def completion(self, body):
+        prompt = body['messages'][-1]['content']
+        if 'UMG widget' in prompt:
+            content = json.dumps({'widget_file': '// widget'})
+        else:
+            content = super().completion(body)['choices'][0]['message']['content']
+        return {'choices': [{'message': {'role': 'assistant', 'content': f'Here you go:\n```json\n{content}\n```'}}]}
+
+
+def test_game_logic_and_registered_kinds(tmp_path):
+    with FencedStub(latency=0.0) as stub, CodeGenerator(stub.url) as generator:
+        generator.set_output_dir(tmp_path)
+        result = generator.generate_game_logic('Inventory System', 'Slots and stacks')
+        assert (tmp_path / 'InventorySystem.h').read_text() == result['header_file']
+        
+        generator.register_kind(GenerationKind('widget', 'UMG widget', lambda name, layout='': f'UMG widget {name}',
+                                               {'widget_file': '{name}Widget.h'}))
+        outcomes = list(generator.generate_batch([{'kind': 'widget', 'name': 'Hud', 'layout': 'top'},
+                                                  {'kind': 'unknown', 'name': 'Nope'}]))
+        by_name = {outcome['spec']['name']: outcome for outcome in outcomes}
+        assert (tmp_path / 'HudWidget.h').read_text() == '// widget'
+        assert 'Unknown generation kind' in by_name['Nope']['error']
+        
+        stages = generator.stats()
+        assert set(stages) == {'game_logic', 'widget'}
+        assert {'prompt', 'request', 'extract', 'validate', 'write'} <= set(stages['game_logic'])
+
+
+def test_reply_missing_a_file_is_rejected(tmp_path):
+    with FencedStub(latency=0.0) as stub, CodeGenerator(stub.url) as generator:
+        generator.set_output_dir(tmp_path)
+        generator.register_kind(GenerationKind('pair', 'pair', lambda name: 'UMG widget',
+                                               {'widget_file': '{name}.h', 'other_file': '{name}.cpp'}))
+        with pytest.raises(ValueError):
+            generator.generate('pair', 'Broken')
+    assert not list(tmp_path.iterdir())
+
+
+def test_cache_hit_skips_the_model_and_bypass_refreshes(stub, tmp_path):
+    cache = GenerationCache(tmp_path / 'cache')
+    with CodeGenerator(stub.url, cache=cache) as generator:
+        generator.set_output_dir(tmp_path / 'Source')
+        fresh = generator.generate_character_class('Npc', TRAITS)
+        assert generator.generate_character_class('Npc', TRAITS) == fresh
+        assert stub.requests == 1 and cache.stats()['hits'] == 1
+        
+        entry, = (tmp_path / 'cache').glob('*/*.json')
+        entry.write_text(json.dumps({'header_file': 'stale', 'source_file': 'stale'}))
+        assert generator.generate_character_class('Npc', TRAITS)['header_file'] == 'stale'
+        assert generator.generate_character_class('Npc', TRAITS, bypass_cache=True) == fresh
+        assert stub.requests == 2
+        assert generator.generate_character_class('Npc', TRAITS) == fresh
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = GenerationCache(tmp_path, max_bytes=250)
+    value = {'v': 'x' * 100}
+    cache.put('aa', value)
+    cache.put('bb', value)
+    # Make the order explicit instead of relying on filesystem timestamp resolution
+    os.utime(cache._path('aa'), (1000, 1000))
+    os.utime(cache._path('bb'), (2000, 2000))
+    assert cache.get('aa') == value
+    
+    cache.put('cc', value)
+    assert cache.get('bb') is None
+    assert cache.get('aa') == value and cache.get('cc') == value
+    assert cache.stats()['evictions'] == 1 and cache.stats()['bytes'] <= 250
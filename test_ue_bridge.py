@@ -0,0 +1,570 @@
+"""
+Tests for the UnrealBridge wire protocol and message handling.
+
+Run with: python -m pytest -q
+"""
+
+import json
+import random
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List
+
+import pytest
+
+from ue_bridge import (AdmissionController, BridgeConnection, BridgeProtocolError, DecisionCache, FrameDecoder,
+                       InputAggregator, LatestValueGate, SharedMemoryClient, ShmRing, Subscriber, SubscriptionHub,
+                       TrafficRecorder, UnrealBridge, WireFraming, WorkerPool, WorldStateStore, available_codecs,
+                       encode_frame, read_traffic)
+from ue_bridge_bench import StubCollective, _free_port, load_traffic, replay_into_bridge
+
+
+LEGACY_MESSAGES = [
+    {'command': 'decision_request', 'agent_id': 'Nova', 'urgent': True, 'target': None, 'retry': False,
+     'offset': -1.5e3, 'note': 'café "quoted" \\ {not} [a] container', 'pad': 'x' * 5000},
+    {'command': 'input_received', 'agent_id': 'Nova', 'keys': [1, {'nested': '}'}], 'ratio': 1e-3},
+]
+
+
+def _legacy_stream() -> bytes:
+    # Mix escaped and raw UTF-8 strings, with whitespace between documents
+    return b' \n'.join(json.dumps(message, ensure_ascii=index == 0).encode()
+                       for index, message in enumerate(LEGACY_MESSAGES)) + b'\n'
+
+
+def test_legacy_split_at_every_offset():
+    data = _legacy_stream()
+    for cut in range(len(data) + 1):
+        decoder = FrameDecoder()
+        decoder.feed(data[:cut])
+        received = decoder.messages()
+        decoder.feed(data[cut:])
+        received += decoder.messages()
+        assert received == LEGACY_MESSAGES, f"split at byte {cut}"
+
+
+@pytest.mark.parametrize('size', [1, 7, 64, 4096])
+def test_legacy_small_reads(size):
+    data = _legacy_stream()
+    decoder = FrameDecoder()
+    received = []
+    for start in range(0, len(data), size):
+        decoder.feed(data[start:start + size])
+        received += decoder.messages()
+    assert received == LEGACY_MESSAGES
+
+
+@pytest.mark.parametrize('payload', [b'[1, 2]', b'42', b'{"a": tru}', b'{"a": 1]'])
+def test_legacy_rejects_malformed(payload):
+    decoder = FrameDecoder()
+    decoder.feed(payload)
+    with pytest.raises(BridgeProtocolError):
+        decoder.messages()
+
+
+def test_legacy_enforces_max_frame_size():
+    decoder = FrameDecoder(max_frame_size=100)
+    decoder.feed(b'{"pad": "' + b'x' * 200)
+    with pytest.raises(BridgeProtocolError):
+        decoder.messages()
+
+
+def test_legacy_stops_after_handshake():
+    decoder = FrameDecoder()
+    handshake = {'command': 'handshake', 'framing': 'length_prefix'}
+    follow_up = {'command': 'ping'}
+    decoder.feed(json.dumps(handshake).encode() + encode_frame(follow_up, WireFraming.LENGTH_PREFIX))
+    assert decoder.messages() == [handshake]
+    decoder.switch(WireFraming.LENGTH_PREFIX)
+    assert decoder.messages() == [follow_up]
+
+
+@pytest.mark.parametrize('framing', [WireFraming.LENGTH_PREFIX, WireFraming.NDJSON])
+def test_framed_split_at_every_offset(framing):
+    data = b''.join(encode_frame(message, framing) for message in LEGACY_MESSAGES)
+    for cut in range(0, len(data) + 1, 7):
+        decoder = FrameDecoder(framing)
+        decoder.feed(data[:cut])
+        received = decoder.messages()
+        decoder.feed(data[cut:])
+        received += decoder.messages()
+        assert received == LEGACY_MESSAGES, f"split at byte {cut}"
+
+
+def _start_bridge(mode: str, **options) -> UnrealBridge:
+    bridge = UnrealBridge('.', port=_free_port(), **options)
+    bridge.start_server(mode=mode)
+    return bridge
+
+
+def _read_responses(sock: socket.socket, count: int) -> List[Dict]:
+    decoder = FrameDecoder()
+    responses = []
+    while len(responses) < count:
+        data = sock.recv(65536)
+        assert data, "connection closed early"
+        decoder.feed(data)
+        responses += decoder.messages()
+    return responses
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_tagged_and_untagged_keep_per_agent_order(mode):
+    bridge = _start_bridge(mode)
+    handled = []
+    bridge.register_handler('input_received', lambda m: handled.append(m['command']) or {'processed': True})
+    bridge.register_handler('decision_request', lambda m: handled.append(m['command']) or {'action': 'wait'})
+    try:
+        with socket.create_connection(('localhost', bridge.port), timeout=5) as sock:
+            sock.sendall(encode_frame({'command': 'input_received', 'agent_name': 'Nova', 'request_id': 1})
+                         + encode_frame({'command': 'decision_request', 'agent_name': 'Nova'}))
+            _read_responses(sock, 2)
+        assert handled == ['input_received', 'decision_request']
+    finally:
+        bridge.stop()
+
+
+def test_aggregated_inputs_are_admitted_when_acknowledged():
+    bridge = UnrealBridge('.', input_aggregator=InputAggregator(window=60),
+                          admission=AdmissionController(high_watermark=1, low_watermark=0, max_pending=1))
+    release = threading.Event()
+    bridge.register_handler('dialogue_request', lambda m: release.wait(5) and {'status': 'ok'})
+    try:
+        accepted = bridge.dispatch({'command': 'input_received', 'agent_name': 'Nova', 'input_type': 'move'})
+        assert accepted.result(1)['processed'] is True
+        
+        blocker = bridge.dispatch({'command': 'dialogue_request', 'agent_name': 'Aura'})
+        rejected = bridge.dispatch({'command': 'input_received', 'agent_name': 'Nova', 'input_type': 'move'})
+        assert rejected.result(1) == {'processed': False, 'status': 'overloaded'}
+        
+        # The acknowledged input is applied even though the bridge is still overloaded
+        merged, = bridge.input_aggregator.flush()
+        release.set()
+        assert blocker.result(5) == {'status': 'ok'}
+        assert merged.result(5).get('status') != 'overloaded'
+        assert bridge.input_aggregator.stats()['received'] == 1
+    finally:
+        release.set()
+        bridge.stop()
+
+
+def test_slow_reader_does_not_stall_deadlines():
+    bridge = _start_bridge('thread', workers=4)
+    
+    def dialogue(message):
+        if message.get('size'):
+            return {'pad': 'x' * message['size']}
+        time.sleep(0.5)
+        return {'status': 'ok'}
+    
+    bridge.register_handler('dialogue_request', dialogue)
+    stalled = socket.create_connection(('localhost', bridge.port))
+    try:
+        # Fill both socket buffers with responses this client never reads, then
+        # have its deadline fallback settle while the writes are blocked
+        stalled.sendall(b''.join(encode_frame({'command': 'dialogue_request', 'agent_name': 'Flood',
+                                               'size': 1 << 20, 'request_id': i}) for i in range(16)))
+        time.sleep(0.2)
+        stalled.sendall(encode_frame({'command': 'dialogue_request', 'agent_name': 'Slow',
+                                      'deadline_ms': 20, 'request_id': 'late'}))
+        time.sleep(0.1)
+        
+        with socket.create_connection(('localhost', bridge.port), timeout=5) as sock:
+            start = time.perf_counter()
+            sock.sendall(encode_frame({'command': 'dialogue_request', 'agent_name': 'Other',
+                                       'deadline_ms': 20, 'request_id': 1}))
+            response, = _read_responses(sock, 1)
+            assert response['status'] == 'timeout'
+            assert time.perf_counter() - start < 0.4
+    finally:
+        stalled.close()
+        bridge.stop()
+
+
+def test_metrics_types_and_concurrent_scrapes():
+    bridge = UnrealBridge('.', admission=AdmissionController(high_watermark=0, low_watermark=0, max_pending=0))
+    stop = threading.Event()
+    
+    def shed_many():
+        # Every command is shed, each under a new label
+        i = 0
+        while not stop.is_set():
+            bridge.dispatch({'command': f'custom_{i % 5000}', 'agent_name': 'Nova'})
+            i += 1
+    
+    thread = threading.Thread(target=shed_many)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            text = bridge.get_metrics()
+    finally:
+        stop.set()
+        thread.join()
+        bridge.stop()
+    
+    assert '# TYPE ue_bridge_shed_total counter' in text
+    assert '# TYPE ue_bridge_queue_depth gauge' in text
+    assert '# TYPE ue_bridge_coalesced_total counter' in text
+
+
+def test_inline_shared_memory_decision_does_not_block_dispatch():
+    bridge = UnrealBridge('.', workers=4)
+    bridge.connect_consciousness(StubCollective(latency=0.5))
+    name = bridge.start_shared_memory_server()
+    try:
+        with SharedMemoryClient(name) as client:
+            # Untagged and deadline-free, so the server runs it on its own thread
+            slow = threading.Thread(target=client.request, args=(
+                {'command': 'decision_request', 'agent_name': 'Nova', 'options': ['wave']},))
+            slow.start()
+            time.sleep(0.1)
+            
+            start = time.perf_counter()
+            future = bridge.dispatch({'command': 'dialogue_request', 'agent_name': 'Aura'})
+            assert time.perf_counter() - start < 0.1
+            future.result(5)
+            slow.join()
+    finally:
+        bridge.stop()
+
+
+def test_shm_ring_wraps_and_reports_full():
+    buffer = bytearray(ShmRing.HEADER_SIZE + 256)
+    producer, consumer = ShmRing(memoryview(buffer)), ShmRing(memoryview(buffer))
+    rng = random.Random(0)
+    expected = deque()
+    
+    for i in range(2000):
+        if rng.random() < 0.55:
+            payload = bytes([i % 256]) * rng.randint(0, 100)
+            if producer.write(payload):
+                expected.append(payload)
+            else:
+                assert expected, "an empty ring must accept a message that fits"
+        else:
+            assert consumer.read() == (expected.popleft() if expected else None)
+    while expected:
+        assert consumer.read() == expected.popleft()
+    assert consumer.read() is None
+    
+    with pytest.raises(BridgeProtocolError):
+        producer.write(b'x' * 256)
+
+
+def test_shared_memory_round_trip():
+    bridge = UnrealBridge('.')
+    bridge.register_handler('echo', lambda message: {'echo': message['value']})
+    name = bridge.start_shared_memory_server(size=64 * 1024)
+    try:
+        with SharedMemoryClient(name) as client:
+            for size in (0, 10, 20000):
+                assert client.request({'command': 'echo', 'value': 'v' * size}) == {'echo': 'v' * size}
+    finally:
+        bridge.stop()
+
+
+def test_decision_cache_expires_after_ttl():
+    cache = DecisionCache(ttl=0.05)
+    key = cache.key_for('Nova', ['wave'], {})
+    cache.put('Nova', key, {'action': 'wave'})
+    assert cache.get(key) == {'action': 'wave'}
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_decision_cache_evicts_least_recently_used():
+    cache = DecisionCache(max_entries=2)
+    keys = [cache.key_for('Nova', [action], {}) for action in ('a', 'b', 'c')]
+    cache.put('Nova', keys[0], {'action': 'a'})
+    cache.put('Nova', keys[1], {'action': 'b'})
+    cache.get(keys[0])
+    cache.put('Nova', keys[2], {'action': 'c'})
+    assert [cache.get(key) is not None for key in keys] == [True, False, True]
+    
+    small = DecisionCache(max_bytes=300)
+    for i, key in enumerate(keys):
+        small.put('Nova', key, {'action': 'x' * 100, 'i': i})
+    assert small.get(keys[0]) is None and small.get(keys[2]) is not None
+    assert small.size_bytes <= 300
+    assert small.stats()['evictions'] >= 1
+
+
+def test_input_invalidates_cached_decisions():
+    cache = DecisionCache(ttl=60)
+    bridge = UnrealBridge('.', decision_cache=cache)
+    bridge.connect_consciousness(StubCollective())
+    decision = {'command': 'decision_request', 'agent_name': 'Nova', 'options': ['wave']}
+    try:
+        bridge.process_message(decision)
+        bridge.process_message(decision)
+        assert cache.stats()['hits'] == 1
+        
+        bridge.process_message({'command': 'input_received', 'agent_name': 'Nova', 'input_type': 'jump'})
+        assert cache.stats()['entries'] == 0
+        bridge.process_message(decision)
+        assert cache.stats()['misses'] == 2
+    finally:
+        bridge.stop()
+
+
+def test_decision_computed_before_invalidation_is_not_stored():
+    cache = DecisionCache(ttl=60)
+    key = cache.key_for('Nova', ['wave'], {})
+    generation = cache.generation('Nova')
+    cache.invalidate('Nova')
+    cache.put('Nova', key, {'action': 'wave'}, generation)
+    assert cache.get(key) is None
+    
+    cache.put('Nova', key, {'action': 'wave'}, cache.generation('Nova'))
+    assert cache.get(key) == {'action': 'wave'}
+
+
+def test_process_backend_rejects_decision_cache():
+    with pytest.raises(ValueError):
+        UnrealBridge('.', worker_backend='process', consciousness_factory=StubCollective,
+                     decision_cache=DecisionCache())
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_handshake_switches_to_msgpack_with_pipelined_frame(mode):
+    msgpack = available_codecs()['msgpack']
+    bridge = _start_bridge(mode)
+    bridge.register_handler('echo', lambda message: {'echo': message['value']})
+    try:
+        with socket.create_connection(('localhost', bridge.port), timeout=5) as sock:
+            # The first binary frame arrives in the same segment as the handshake
+            sock.sendall(json.dumps({'command': 'handshake', 'framing': 'length_prefix', 'codec': 'msgpack'}).encode()
+                         + encode_frame({'command': 'echo', 'value': b'\x00\xff'}, WireFraming.LENGTH_PREFIX, msgpack))
+            # The reply is still legacy JSON; everything after it is msgpack
+            data = b''
+            while True:
+                chunk = sock.recv(65536)
+                assert chunk, "connection closed early"
+                data += chunk
+                try:
+                    reply, end = json.JSONDecoder().raw_decode(data.decode('latin-1'))
+                    break
+                except ValueError:
+                    pass
+            decoder = FrameDecoder(WireFraming.LENGTH_PREFIX, codec=msgpack)
+            decoder.feed(data[end:])
+            responses = decoder.messages()
+            while not responses:
+                decoder.feed(sock.recv(65536))
+                responses = decoder.messages()
+        
+        echoed, = responses
+        assert reply['status'] == 'ok' and reply['codec'] == 'msgpack'
+        assert echoed == {'echo': b'\x00\xff'}
+    finally:
+        bridge.stop()
+
+
+@pytest.mark.parametrize('request_, reason', [
+    ({'framing': 'ndjson', 'codec': 'msgpack'}, 'requires length_prefix'),
+    ({'framing': 'length_prefix', 'codec': 'protobuf'}, 'Unsupported codec'),
+])
+def test_handshake_rejects_bad_codec(request_, reason):
+    connection = BridgeConnection()
+    decoder = FrameDecoder()
+    decoder.feed(connection.negotiate(dict(request_, command='handshake')))
+    reply, = decoder.messages()
+    assert reply['status'] == 'error' and reason in reply['reason']
+    assert connection.framing is WireFraming.JSON and connection.codec.name == 'json'
+
+
+def test_world_state_snapshot_deltas_and_resync():
+    store = WorldStateStore()
+    assert store.apply({'agent_name': 'Nova', 'version': 1, 'full': True, 'entities': {
+        'door': {'open': False, 'hp': 10}, 'crate': {'x': 1}}}) == {'status': 'ok', 'version': 1}
+    
+    assert store.apply({'agent_name': 'Nova', 'base_version': 1, 'version': 2, 'removed': ['crate'],
+                        'entities': {'door': {'open': True, 'hp': None}, 'lamp': {'on': True}}})['status'] == 'ok'
+    assert store.snapshot('Nova') == {'version': 2, 'entities': {'door': {'open': True}, 'lamp': {'on': True}}}
+    
+    # A delta against a version we never saw leaves the world untouched
+    assert store.apply({'agent_name': 'Nova', 'base_version': 4, 'version': 5, 'entities': {'door': {'open': False}}}) \
+        == {'status': 'resync', 'agent_name': 'Nova', 'version': 2}
+    assert store.entity('Nova', 'door') == {'open': True}
+    assert store.apply({'agent_name': 'Aura', 'base_version': 0, 'version': 1})['status'] == 'resync'
+    assert store.stats()['resyncs'] == 2
+
+
+def test_process_backend_keeps_world_state_in_parent():
+    bridge = UnrealBridge('.', workers=1, worker_backend='process', consciousness_factory=StubCollective)
+    try:
+        response = bridge.dispatch({'command': 'game_state_update', 'agent_name': 'Nova', 'version': 1, 'full': True,
+                                    'entities': {'door': {'open': True}}}).result(10)
+        assert response == {'status': 'ok', 'version': 1}
+        assert bridge.world_state.entity('Nova', 'door') == {'open': True}
+    finally:
+        bridge.stop()
+
+
+def test_coalesced_request_without_deadline_is_not_timed_out_by_leader():
+    bridge = UnrealBridge('.', workers=1)
+    bridge.connect_consciousness(StubCollective(latency=0.2))
+    decision = {'command': 'decision_request', 'agent_name': 'Nova', 'options': ['wave']}
+    try:
+        busy = bridge.dispatch({'command': 'dialogue_request', 'agent_name': 'Nova'})
+        leader = bridge.dispatch(dict(decision, deadline_ms=20))
+        joiner = bridge.dispatch(decision)
+        assert leader.result(5)['status'] == 'timeout'
+        assert joiner.result(5) == {'action': 'wave', 'parameters': {}, 'reasoning': 'stub', 'emotion': 'calm'}
+        busy.result(5)
+    finally:
+        bridge.stop()
+
+
+@pytest.mark.parametrize('overloaded', [False, True])
+def test_expired_queued_work_runs_unless_overloaded(overloaded):
+    high_watermark = 1 if overloaded else 10
+    bridge = UnrealBridge('.', workers=1, admission=AdmissionController(high_watermark, 0, 10))
+    handled = []
+    
+    def on_input(message):
+        if message.get('block'):
+            time.sleep(0.2)
+        handled.append(message.get('input_type'))
+        return {'processed': True}
+    
+    bridge.register_handler('input_received', on_input)
+    try:
+        busy = bridge.dispatch({'command': 'input_received', 'agent_name': 'Nova', 'input_type': 'busy', 'block': True})
+        late = bridge.dispatch({'command': 'input_received', 'agent_name': 'Nova', 'input_type': 'late',
+                                'deadline_ms': 20})
+        assert late.result(5) == {'processed': False, 'status': 'timeout'}
+        busy.result(5)
+        time.sleep(0.1)
+        assert handled == (['busy'] if overloaded else ['busy', 'late'])
+        assert bridge.workers.expired == int(overloaded)
+    finally:
+        bridge.stop()
+
+
+def test_recorded_traffic_rotates_and_replays(tmp_path):
+    recorder = TrafficRecorder(tmp_path / 'traffic.log', max_bytes=400, backups=50)
+    bridge = UnrealBridge('.', recorder=recorder)
+    bridge.register_handler('echo', lambda message: {'echo': message['value']})
+    try:
+        for i in range(20):
+            bridge.dispatch({'command': 'echo', 'agent_name': 'Nova', 'value': i}).result(5)
+        # Responses are recorded from a done callback, which may lag result()
+        deadline = time.monotonic() + 5
+        while recorder.records < 40 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        bridge.stop()
+        recorder.close()
+    
+    assert recorder.rotations > 1
+    assert (tmp_path / 'traffic.log.1').exists()
+    sequence = [record['s'] for record in read_traffic(tmp_path / 'traffic.log') if 'in' in record]
+    assert sequence == list(range(1, 21))
+    
+    entries = load_traffic(tmp_path / 'traffic.log')
+    assert [entry['response'] for entry in entries] == [{'echo': i} for i in range(20)]
+    replay = UnrealBridge('.')
+    replay.register_handler('echo', lambda message: {'echo': message['value']})
+    summary = replay_into_bridge(entries, replay)
+    assert summary['requests'] == 20 and summary['changed_responses'] == 0
+    assert summary['commands']['echo']['count'] == 20
+
+
+def test_inline_caller_runs_only_its_own_work():
+    pool = WorkerPool(2)
+    queued = []
+    
+    def own():
+        # Another connection's work lands behind ours while it runs
+        queued.append(pool.submit('Nova', lambda: time.sleep(0.3) or threading.current_thread()))
+        return threading.current_thread()
+    
+    try:
+        start = time.perf_counter()
+        assert pool.run_inline(pool.submit, 'Nova', own).result(1) is threading.current_thread()
+        assert time.perf_counter() - start < 0.2
+        assert queued[0].result(5) is not threading.current_thread()
+    finally:
+        pool.shutdown()
+
+
+def test_datagram_gate_coalesces_per_input_type():
+    release = threading.Event()
+    handled = []
+    
+    def handler(message):
+        handled.append(message['input_type'])
+        future = Future()
+        threading.Thread(target=lambda: release.wait(5) and future.set_result({'processed': True})).start()
+        return future
+    
+    gate = LatestValueGate(handler)
+    results = [gate.offer('ue', {'command': 'input_received', 'agent_name': 'Nova', 'input_type': kind, 'seq': seq})
+               for seq, kind in enumerate(['move', 'jump', 'fire', 'move', 'move'], 1)]
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(handled) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    assert results == ['dispatched', 'dispatched', 'dispatched', 'coalesced', 'coalesced']
+    assert sorted(handled) == ['fire', 'jump', 'move', 'move']
+    assert gate.stats()['coalesced'] == 1
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_push_after_subscribe_and_cleanup_on_close(mode):
+    bridge = _start_bridge(mode)
+    try:
+        with socket.create_connection(('localhost', bridge.port), timeout=5) as sock:
+            sock.sendall(encode_frame({'command': 'subscribe', 'agent_name': 'Nova',
+                                       'topics': ['character_action'], 'request_id': 1}))
+            reply, = _read_responses(sock, 1)
+            assert reply == {'status': 'ok', 'agent_name': 'Nova', 'topics': ['character_action'], 'request_id': 1}
+            
+            assert bridge.publish('emotion_state', 'Nova', {'emotion': 'calm'}) == 0
+            assert bridge.publish('character_action', 'Nova', {'action': 'wave'}) == 1
+            push, = _read_responses(sock, 1)
+            assert push['push'] == 'character_action' and push['data'] == {'action': 'wave'}
+            assert 'request_id' not in push
+        
+        deadline = time.monotonic() + 5
+        while bridge.subscriptions.stats()['subscribers'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert bridge.subscriptions.stats()['subscribers'] == 0
+        assert bridge.publish('character_action', 'Nova', {'action': 'wave'}) == 0
+    finally:
+        bridge.stop()
+
+
+def test_slow_subscriber_gets_latest_push_per_topic_and_agent():
+    wakes = []
+    hub = SubscriptionHub()
+    subscriber = Subscriber(lambda: wakes.append(1))
+    hub.subscribe(subscriber, '*', ['character_action', 'emotion_state'])
+    
+    for action in ('wave', 'jump', 'run'):
+        hub.publish('character_action', 'Nova', {'action': action})
+    hub.publish('emotion_state', 'Nova', {'emotion': 'happy'})
+    hub.publish('character_action', 'Aura', {'action': 'sit'})
+    hub.publish('character_action', 'Nova', {'action': 'stop'})
+    
+    pushes = subscriber.take()
+    assert [(push['push'], push['agent_name'], push['data']) for push in pushes] == [
+        ('character_action', 'Nova', {'action': 'stop'}),
+        ('emotion_state', 'Nova', {'emotion': 'happy'}),
+        ('character_action', 'Aura', {'action': 'sit'}),
+    ]
+    assert wakes == [1] and subscriber.coalesced == 3
+    assert subscriber.take() == []
+    
+    hub.unsubscribe(subscriber, topics=['character_action'])
+    assert hub.publish('character_action', 'Nova', {'action': 'wave'}) == 0
+    assert hub.publish('emotion_state', 'Nova', {'emotion': 'sad'}) == 1
+    hub.remove(subscriber)
+    assert hub.stats()['subscribers'] == 0 and subscriber.take() == []
@@ -9,26 +9,135 @@ Architecture:
 - Consciousness system (VIBE MIRACLE) feeds into game logic
 """
 
+import asyncio
+import bisect
+import hashlib
 import socket
+import struct
 import json
 import subprocess
 import time
 import os
+import re
 import threading
-from typing import Dict, List, Optional, Callable
+import weakref
+import zlib
+from collections import OrderedDict, deque
+import heapq
+import queue
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import FIRST_COMPLETED, Future, InvalidStateError, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from typing import Dict, Iterator, List, Optional, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='[UE_BRIDGE] %(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the application (see configure_logging), not on import
+LOG_FORMAT = '[UE_BRIDGE] %(asctime)s - %(levelname)s - %(message)s'
 logger = logging.getLogger(__name__)
 
 
+class _QueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them; the listener thread formats.
+    
+    Log arguments are therefore rendered later, so pass values (strings,
+    numbers) rather than objects that are mutated after the call.
+    """
+    
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # Never block the message path on a slow log sink
+
+
+def configure_logging(level: int = logging.INFO, handler: logging.Handler = None,
+                      fmt: str = LOG_FORMAT, queue_size: int = 10000) -> QueueListener:
+    """
+    Route ue_bridge logging through a bounded queue drained by a background thread.
+    
+    Formatting and I/O happen on the listener thread; a full queue drops records
+    instead of stalling a connection. Call listener.stop() on shutdown to flush.
+    """
+    handler = handler or logging.StreamHandler()
+    if handler.formatter is None:
+        handler.setFormatter(logging.Formatter(fmt))
+    
+    log_queue = queue.Queue(queue_size)
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    for existing in [h for h in logger.handlers if isinstance(h, _QueueHandler)]:
+        logger.removeHandler(existing)
+    logger.addHandler(_QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    listener.start()
+    return listener
+
+
+class LogSampler:
+    """
+    Per-command sampling and rate limiting for per-message log lines.
+    
+    rates maps a command to the fraction of its messages that get logged
+    (1.0 logs all, 0 none); commands not listed use default_rate. Sampling
+    is every-Nth rather than random so it costs a counter increment.
+    max_per_second additionally caps each command's log lines per second.
+    """
+    
+    def __init__(self, rates: Dict[str, float] = None, default_rate: float = 1.0,
+                 max_per_second: float = 0):
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self.max_per_second = max_per_second
+        self.suppressed: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._windows: Dict[str, List] = {}
+        self._lock = threading.Lock()
+    
+    def sample(self, command: str, level: int = logging.INFO) -> bool:
+        """True if this message's log line should be emitted."""
+        if not logger.isEnabledFor(level):
+            return False
+        rate = self.rates.get(command, self.default_rate)
+        if rate >= 1.0 and not self.max_per_second:
+            return True
+        
+        with self._lock:
+            if rate <= 0:
+                keep = False
+            else:
+                count = self._counts.get(command, 0) + 1
+                self._counts[command] = count
+                keep = count % max(1, round(1 / rate)) == 0
+            
+            if keep and self.max_per_second:
+                now = time.monotonic()
+                window = self._windows.get(command)
+                if window is None or now - window[0] >= 1.0:
+                    window = self._windows[command] = [now, 0]
+                window[1] += 1
+                keep = window[1] <= self.max_per_second
+            
+            if not keep:
+                self.suppressed[command] = self.suppressed.get(command, 0) + 1
+            return keep
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'suppressed': dict(self.suppressed)}
+
+
 class GameCommand(Enum):
     """Commands that flow from game engine to AI."""
     SPAWN_CHARACTER = "spawn_character"
@@ -37,6 +146,9 @@ class GameCommand(Enum):
     DIALOGUE_REQUEST = "dialogue_request"
     DECISION_REQUEST = "decision_request"
     GAME_STATE_UPDATE = "game_state_update"
+    HANDSHAKE = "handshake"
+    SUBSCRIBE = "subscribe"
+    UNSUBSCRIBE = "unsubscribe"
 
 
 class AIResponse(Enum):
@@ -80,102 +192,2756 @@ class AIDecision:
             self.timestamp = time.time()
 
 
-class UnrealBridge:
+class MessageCodec:
     """
-    Main bridge between Unreal Engine and Python consciousness system.
+    Serializes bridge messages. JSON is the default; binary codecs plug in by
+    subclassing and registering, and are picked per connection at handshake.
+    """
+    name = 'json'
+    binary = False  # Binary codecs need length_prefix framing
+    
+    def encode(self, message: Dict) -> bytes:
+        return json.dumps(message, separators=(',', ':')).encode()
+    
+    def decode(self, payload) -> Dict:
+        # json.loads takes bytes directly, no intermediate str copy
+        return json.loads(payload)
+
+
+class MsgPackCodec(MessageCodec):
+    """MessagePack (pip install msgpack)."""
+    name = 'msgpack'
+    binary = True
+    
+    def __init__(self):
+        import msgpack
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+    
+    def encode(self, message: Dict) -> bytes:
+        return self._packb(message, use_bin_type=True)
+    
+    def decode(self, payload) -> Dict:
+        return self._unpackb(payload, raw=False)
+
+
+class CBORCodec(MessageCodec):
+    """CBOR (pip install cbor2)."""
+    name = 'cbor'
+    binary = True
+    
+    def __init__(self):
+        import cbor2
+        self._dumps = cbor2.dumps
+        self._loads = cbor2.loads
+    
+    def encode(self, message: Dict) -> bytes:
+        return self._dumps(message)
+    
+    def decode(self, payload) -> Dict:
+        return self._loads(payload)
+
+
+JSON_CODEC = MessageCodec()
+_codec_types = [MessageCodec, MsgPackCodec, CBORCodec]
+_codecs: Optional[Dict[str, MessageCodec]] = None
+
+
+def register_codec(codec_type: type):
+    """Make another MessageCodec subclass available for negotiation."""
+    global _codecs
+    _codec_types.append(codec_type)
+    _codecs = None
+
+
+def available_codecs() -> Dict[str, MessageCodec]:
+    """Codecs whose libraries are installed, keyed by name."""
+    global _codecs
+    if _codecs is None:
+        codecs = {}
+        for codec_type in _codec_types:
+            try:
+                codec = JSON_CODEC if codec_type is MessageCodec else codec_type()
+            except ImportError:
+                continue
+            codecs[codec.name] = codec
+        _codecs = codecs
+    return _codecs
+
+
+class WireFraming(Enum):
+    """How messages are delimited on a bridge connection."""
+    JSON = "json"                    # Legacy: back-to-back JSON documents
+    NDJSON = "ndjson"                # One JSON document per line
+    LENGTH_PREFIX = "length_prefix"  # 4-byte big-endian length + payload
+
+
+class BridgeProtocolError(Exception):
+    """Raised when a peer sends bytes that cannot be framed or decoded."""
+
+
+_LENGTH_HEADER = struct.Struct('>I')
+_NON_WHITESPACE = re.compile(rb'[^ \t\r\n]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+
+
+class FrameDecoder:
+    """
+    Incremental message decoder for one connection.
+    
+    Bytes are appended to a single reusable buffer and complete messages are
+    pulled out as they become available, so partial reads, oversized messages
+    and several messages in one TCP segment are all handled.
+    """
+    
+    def __init__(self, framing: WireFraming = WireFraming.JSON, max_frame_size: int = 16 * 1024 * 1024,
+                 codec: MessageCodec = JSON_CODEC):
+        self.framing = framing
+        self.max_frame_size = max_frame_size
+        self.codec = codec
+        self.buffer = bytearray()
+        self._pos = 0
+        # Legacy JSON scanner state, kept across reads so each byte is scanned once
+        self._scan = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+    
+    def feed(self, data) -> None:
+        """Append received bytes to the connection buffer."""
+        # Compact lazily: once per read instead of once per message
+        if self._pos:
+            del self.buffer[:self._pos]
+            self._scan = max(0, self._scan - self._pos)
+            self._start = max(0, self._start - self._pos)
+            self._pos = 0
+        self.buffer += data
+    
+    def switch(self, framing: WireFraming, codec: MessageCodec = None) -> None:
+        """Change framing (and codec) mid-stream after a handshake; unread bytes are kept."""
+        self.framing = framing
+        if codec is not None:
+            self.codec = codec
+        self._scan = self._start = self._pos
+        self._depth = 0
+        self._in_string = False
+    
+    def messages(self) -> List[Dict]:
+        """Pop every complete message currently buffered."""
+        if self.framing == WireFraming.JSON:
+            return self._legacy_messages()
+        
+        messages = []
+        while True:
+            message = self._next_frame()
+            if message is None:
+                return messages
+            messages.append(message)
+            # A handshake may change the framing of everything after it
+            if message.get('command') == GameCommand.HANDSHAKE.value:
+                return messages
+    
+    def _next_frame(self) -> Optional[Dict]:
+        if self.framing == WireFraming.LENGTH_PREFIX:
+            if len(self.buffer) - self._pos < _LENGTH_HEADER.size:
+                return None
+            (length,) = _LENGTH_HEADER.unpack_from(self.buffer, self._pos)
+            if length > self.max_frame_size:
+                raise BridgeProtocolError(f"Frame of {length} bytes exceeds maximum frame size")
+            start = self._pos + _LENGTH_HEADER.size
+            if len(self.buffer) - start < length:
+                return None
+            self._pos = start + length
+            if self.codec.binary:
+                # Binary codecs read straight from the connection buffer; the view
+                # must be released before the next feed() compacts the buffer
+                with memoryview(self.buffer) as view, view[start:self._pos] as payload:
+                    return self._loads(payload)
+            return self._loads(self.buffer[start:self._pos])
+        
+        while True:
+            end = self.buffer.find(b'\n', self._pos)
+            if end < 0:
+                if len(self.buffer) - self._pos > self.max_frame_size:
+                    raise BridgeProtocolError("Line exceeds maximum frame size")
+                return None
+            start, self._pos = self._pos, end + 1
+            if self.buffer[start:end].strip():
+                return self._loads(self.buffer[start:end])
+    
+    def _legacy_messages(self) -> List[Dict]:
+        """
+        Back-to-back JSON documents with no delimiter. Boundaries come from
+        tracking brace depth and string state over the raw bytes (UTF-8 never
+        reuses ASCII bytes), so only complete documents reach json.loads.
+        """
+        buffer = self.buffer
+        messages = []
+        
+        while True:
+            if self._depth == 0:
+                match = _NON_WHITESPACE.search(buffer, self._scan)
+                if match is None:
+                    self._pos = self._scan = len(buffer)  # Whitespace between messages
+                    break
+                if buffer[match.start()] not in b'{[':
+                    raise BridgeProtocolError("Malformed JSON: messages must be JSON objects")
+                self._start = match.start()
+                self._depth = 1
+                self._scan = match.end()
+            elif self._in_string:
+                match = _STRING_SPECIAL.search(buffer, self._scan)
+                if match is None:
+                    # May already be past the end, when an escape was the last byte
+                    self._scan = max(self._scan, len(buffer))
+                    break
+                if buffer[match.start()] == 0x5C:  # Backslash: skip the escaped byte
+                    self._scan = match.start() + 2
+                else:
+                    self._in_string = False
+                    self._scan = match.end()
+            else:
+                match = _STRUCTURAL.search(buffer, self._scan)
+                if match is None:
+                    self._scan = len(buffer)
+                    break
+                self._scan = match.end()
+                byte = buffer[match.start()]
+                if byte == 0x22:
+                    self._in_string = True
+                elif byte in b'{[':
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        message = self._legacy_document(buffer[self._start:self._scan])
+                        self._pos = self._scan
+                        messages.append(message)
+                        if message.get('command') == GameCommand.HANDSHAKE.value:
+                            break
+        
+        if self._depth and len(buffer) - self._start > self.max_frame_size:
+            raise BridgeProtocolError("Message exceeds maximum frame size")
+        return messages
+    
+    def _legacy_document(self, payload: bytearray) -> Dict:
+        # Anything after a handshake may be binary, so never fail on decode here
+        try:
+            return self._check(json.loads(payload.decode('utf-8', errors='replace')))
+        except ValueError as e:
+            raise BridgeProtocolError(f"Malformed JSON: {e}") from e
+    
+    def _loads(self, payload) -> Dict:
+        try:
+            return self._check(self.codec.decode(payload))
+        except BridgeProtocolError:
+            raise
+        except Exception as e:
+            raise BridgeProtocolError(f"Malformed {self.codec.name} message: {e}") from e
+    
+    @staticmethod
+    def _check(message) -> Dict:
+        if not isinstance(message, dict):
+            raise BridgeProtocolError("Messages must be JSON objects")
+        return message
+
+
+def encode_frame(message: Dict, framing: WireFraming = WireFraming.JSON,
+                 codec: MessageCodec = JSON_CODEC) -> bytes:
+    """Serialize one message for the wire using the given framing and codec."""
+    payload = codec.encode(message)
+    if framing == WireFraming.LENGTH_PREFIX:
+        return _LENGTH_HEADER.pack(len(payload)) + payload
+    if framing == WireFraming.NDJSON:
+        return payload + b'\n'
+    return payload
+
+
+class BridgeConnection:
+    """
+    Per-connection protocol state: framing/codec negotiation plus the decoder.
+    
+    A connection starts in legacy JSON framing with the JSON codec. The client
+    may send {"command": "handshake", "framing": "length_prefix" | "ndjson",
+    "codec": "json" | "msgpack" | "cbor"} to switch; the reply is sent in the
+    old format and everything after it in the new one. Binary codecs require
+    length_prefix framing.
+    """
+    
+    def __init__(self, addr=None, max_frame_size: int = 16 * 1024 * 1024):
+        self.addr = addr
+        self.framing = WireFraming.JSON
+        self.codec = JSON_CODEC
+        self.decoder = FrameDecoder(self.framing, max_frame_size)
+    
+    def feed(self, data) -> List[Dict]:
+        """Buffer received bytes and return every complete message."""
+        self.decoder.feed(data)
+        return self.decoder.messages()
+    
+    def pending(self) -> List[Dict]:
+        """Messages already buffered behind a handshake."""
+        return self.decoder.messages()
+    
+    def encode(self, message: Dict) -> bytes:
+        return encode_frame(message, self.framing, self.codec)
+    
+    @staticmethod
+    def is_handshake(message: Dict) -> bool:
+        return message.get('command') == GameCommand.HANDSHAKE.value
+    
+    def negotiate(self, message: Dict) -> bytes:
+        """Handle a handshake message and return the encoded reply."""
+        supported = [f.value for f in WireFraming]
+        codecs = available_codecs()
+        requested = message.get('framing', self.framing.value)
+        requested_codec = message.get('codec', self.codec.name)
+        
+        reason = None
+        if requested not in supported:
+            reason = f'Unsupported framing: {requested}'
+        elif requested_codec not in codecs:
+            reason = f'Unsupported codec: {requested_codec}'
+        elif codecs[requested_codec].binary and requested != WireFraming.LENGTH_PREFIX.value:
+            reason = f'Codec {requested_codec} requires length_prefix framing'
+        
+        reply = {
+            'status': 'error' if reason else 'ok',
+            'framing': requested if not reason else self.framing.value,
+            'codec': requested_codec if not reason else self.codec.name,
+            'supported_framing': supported,
+            'supported_codecs': list(codecs)
+        }
+        if reason:
+            reply['reason'] = reason
+            return self.encode(reply)
+        
+        encoded = self.encode(reply)
+        self.framing = WireFraming(requested)
+        self.codec = codecs[requested_codec]
+        self.decoder.switch(self.framing, self.codec)
+        return encoded
+
+
+class ShmRing:
+    """
+    Single-producer/single-consumer ring of length-prefixed messages in a shared buffer.
+    
+    head (bytes ever written) and tail (bytes ever read) live on separate cache
+    lines at the start of the buffer; each side only stores its own counter,
+    after the bytes it covers, so no lock is needed across processes. A message
+    never wraps: if it does not fit before the end, the producer writes a pad
+    marker and starts it at offset 0.
+    """
+    
+    HEADER_SIZE = 128
+    _COUNTER = struct.Struct('<Q')
+    _LENGTH = struct.Struct('<I')
+    _PAD = 0xFFFFFFFF
+    
+    def __init__(self, buf: memoryview):
+        self._buf = buf
+        self._data = buf[self.HEADER_SIZE:]
+        self.capacity = len(self._data)
+        self._head = self._load(0)
+        self._tail = self._load(64)
+    
+    def _load(self, offset: int) -> int:
+        return self._COUNTER.unpack_from(self._buf, offset)[0]
+    
+    def write(self, payload: bytes) -> bool:
+        """Append one message; False if the ring is currently too full."""
+        size = self._LENGTH.size + len(payload)
+        if size > self.capacity:
+            raise BridgeProtocolError(f"Message of {len(payload)} bytes exceeds ring capacity {self.capacity}")
+        
+        head = self._head
+        offset = head % self.capacity
+        contiguous = self.capacity - offset
+        needed = size if size <= contiguous else contiguous + size
+        if self.capacity - (head - self._load(64)) < needed:
+            return False
+        
+        if size > contiguous:
+            if contiguous >= self._LENGTH.size:
+                self._LENGTH.pack_into(self._data, offset, self._PAD)
+            head += contiguous
+            offset = 0
+        self._LENGTH.pack_into(self._data, offset, len(payload))
+        self._data[offset + self._LENGTH.size:offset + size] = payload
+        self._head = head + size
+        self._COUNTER.pack_into(self._buf, 0, self._head)  # Publish after the bytes
+        return True
+    
+    def read(self) -> Optional[bytes]:
+        """Pop the next message, or None if the ring is empty."""
+        tail = self._tail
+        if tail == self._load(0):
+            return None
+        
+        offset = tail % self.capacity
+        contiguous = self.capacity - offset
+        if contiguous < self._LENGTH.size or self._LENGTH.unpack_from(self._data, offset)[0] == self._PAD:
+            tail += contiguous
+            offset = 0
+        length = self._LENGTH.unpack_from(self._data, offset)[0]
+        start = offset + self._LENGTH.size
+        payload = bytes(self._data[start:start + length])
+        self._tail = tail + self._LENGTH.size + length
+        self._COUNTER.pack_into(self._buf, 64, self._tail)
+        return payload
+    
+    def release(self):
+        self._data.release()
+        self._buf.release()
+
+
+def _attach_shared_memory(name: str):
+    """Open an existing segment without letting this process's resource tracker unlink it on exit."""
+    from multiprocessing import resource_tracker, shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+class SharedMemoryChannel:
+    """
+    Duplex message channel for co-located processes over one shared memory segment.
+    
+    The segment holds a small control block and two ShmRings: requests from
+    the client and responses from the bridge. Messages are encoded with a
+    MessageCodec; both sides must use the same one. Waiting spins (yielding
+    the CPU) for `spin` seconds before falling back to short sleeps, so busy
+    traffic sees microsecond latency and an idle channel costs little.
+    """
+    
+    MAGIC = b'UEBR'
+    CONTROL = struct.Struct('<4sII??')  # magic, version, ring capacity, server closed, client closed
+    CONTROL_SIZE = 64
+    VERSION = 1
+    
+    def __init__(self, segment, server: bool, codec: MessageCodec = JSON_CODEC, spin: float = 0.0002):
+        magic, version, ring_size, _, _ = self.CONTROL.unpack_from(segment.buf, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise BridgeProtocolError(f"{segment.name} is not a UE bridge channel")
+        
+        self.segment = segment
+        self.name = segment.name
+        self.server = server
+        self.codec = codec
+        self.spin = spin
+        
+        requests = segment.buf[self.CONTROL_SIZE:self.CONTROL_SIZE + ring_size]
+        responses = segment.buf[self.CONTROL_SIZE + ring_size:self.CONTROL_SIZE + 2 * ring_size]
+        self._inbound = ShmRing(requests if server else responses)
+        self._outbound = ShmRing(responses if server else requests)
+        self._send_lock = threading.Lock()
+    
+    @classmethod
+    def create(cls, name: str = None, size: int = 4 * 1024 * 1024, codec: MessageCodec = JSON_CODEC,
+               spin: float = 0.0002) -> 'SharedMemoryChannel':
+        """Create the segment (bridge side). size is per direction."""
+        from multiprocessing import shared_memory
+        ring_size = ShmRing.HEADER_SIZE + size
+        # New segments are zero-filled, so both rings start empty
+        segment = shared_memory.SharedMemory(name=name, create=True, size=cls.CONTROL_SIZE + 2 * ring_size)
+        cls.CONTROL.pack_into(segment.buf, 0, cls.MAGIC, cls.VERSION, ring_size, False, False)
+        return cls(segment, server=True, codec=codec, spin=spin)
+    
+    @classmethod
+    def attach(cls, name: str, codec: MessageCodec = JSON_CODEC, spin: float = 0.0002) -> 'SharedMemoryChannel':
+        """Attach to a segment created by the bridge (client side)."""
+        return cls(_attach_shared_memory(name), server=False, codec=codec, spin=spin)
+    
+    @property
+    def peer_closed(self) -> bool:
+        return self.segment.buf[13 if self.server else 12] != 0
+    
+    @property
+    def closed(self) -> bool:
+        return self.segment.buf[12 if self.server else 13] != 0
+    
+    def _wait(self, attempt: Callable, timeout: Optional[float]):
+        result = attempt()
+        if result is not None and result is not False:
+            return result
+        start = time.perf_counter()
+        while True:
+            waited = time.perf_counter() - start
+            if timeout is not None and waited >= timeout:
+                return None
+            if waited < self.spin:
+                os.sched_yield()
+            else:
+                time.sleep(min(0.001, max(0.00005, waited / 10)))
+            result = attempt()
+            if result is not None and result is not False:
+                return result
+    
+    def send(self, message: Dict, timeout: Optional[float] = 5.0) -> bool:
+        """Encode and enqueue a message, waiting up to timeout while the ring is full."""
+        return self.send_bytes(self.codec.encode(message), timeout)
+    
+    def send_bytes(self, payload: bytes, timeout: Optional[float] = 5.0) -> bool:
+        with self._send_lock:
+            if self.segment.buf is None:
+                return False
+            return bool(self._wait(lambda: self._outbound.write(payload), timeout))
+    
+    def receive(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next message from the peer, or None after timeout."""
+        payload = self.receive_bytes(timeout)
+        return None if payload is None else self.codec.decode(payload)
+    
+    def receive_bytes(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        return self._wait(self._inbound.read, timeout)
+    
+    def close(self):
+        """Mark this side closed; the bridge side also removes the segment."""
+        with self._send_lock:
+            if self.segment.buf is None:
+                return
+            self.segment.buf[12 if self.server else 13] = 1
+            self._inbound.release()
+            self._outbound.release()
+            self.segment.close()
+        if self.server:
+            from multiprocessing import resource_tracker
+            # A forked client sharing our tracker may have unregistered the name
+            resource_tracker.register(self.segment._name, 'shared_memory')
+            try:
+                self.segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SharedMemoryClient:
+    """
+    Reference client for UnrealBridge.start_shared_memory_server(), for tools and tests.
+    
+    request() sends one message and waits for its response. To pipeline, add a
+    request_id to messages, send() them, and match receive() results by it.
+    """
+    
+    def __init__(self, name: str, codec: str = 'json', timeout: float = 5.0):
+        codecs = available_codecs()
+        if codec not in codecs:
+            raise BridgeProtocolError(f"Unsupported codec: {codec}")
+        self.channel = SharedMemoryChannel.attach(name, codecs[codec])
+        self.timeout = timeout
+    
+    def send(self, message: Dict) -> bool:
+        return self.channel.send(message, self.timeout)
+    
+    def receive(self, timeout: float = None) -> Optional[Dict]:
+        return self.channel.receive(self.timeout if timeout is None else timeout)
+    
+    def request(self, message: Dict) -> Dict:
+        if not self.send(message):
+            raise TimeoutError("Bridge is not draining the shared memory channel")
+        response = self.receive()
+        if response is None:
+            raise TimeoutError(f"No response to {message.get('command')}")
+        return response
+    
+    def close(self):
+        self.channel.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Task:
+    """One unit of work queued on a WorkerPool."""
+    __slots__ = ('future', 'fn', 'args', 'local', 'batched', 'deadline', 'expired')
+    
+    def __init__(self, future: Future, fn: Callable, args: tuple, local: bool, batched: bool,
+                 deadline: Optional[float], expired: Optional[Callable[[], Dict]]):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.local = local
+        self.batched = batched
+        self.deadline = deadline
+        self.expired = expired
+    
+    def is_expired(self, now: float) -> bool:
+        return self.deadline is not None and now > self.deadline
+
+
+class WorkerPool:
+    """
+    Runs handler work off the network loop with per-agent ordering.
+    
+    Work for the same key (agent_name) runs one item at a time in submission
+    order, while different agents run in parallel on a shared thread pool.
+    
+    backend="process": each key is also pinned to one single-process shard,
+    which keeps an agent's state in one process and uses every core. Work
+    submitted with local=True (e.g. registered handlers, which live in this
+    process) runs on the thread instead.
+    
+    Batchable work (submit_batched) that queues up behind a busy key, or that
+    arrives within batch_window of it, is handed to its batch function as a
+    single list of up to max_batch items.
+    
+    Work can carry a deadline (time.monotonic()); if it is still queued when
+    the deadline passes while shed_expired() is true (by default always), it
+    is never run and resolves to expired() instead. Otherwise it runs late.
+    
+    run_inline() lets a caller that is going to block on the result anyway run
+    its own work for an idle key on its own thread, skipping the pool handoff;
+    anything queued behind it meanwhile is drained by the pool as usual.
+    """
+    
+    BACKENDS = ('thread', 'process')
+    
+    def __init__(self, workers: int = None, backend: str = 'thread',
+                 initializer: Callable = None, initargs: tuple = (),
+                 max_batch: int = 1, batch_window: float = 0.002, shed_expired: Callable[[], bool] = None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown worker backend: {backend}")
+        
+        if workers is None:
+            # Threads mostly wait on consciousness calls, so oversubscribe like ThreadPoolExecutor
+            cpus = os.cpu_count() or 1
+            workers = cpus if backend == 'process' else min(32, cpus + 4)
+        
+        self.workers = workers
+        self.backend = backend
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.shed_expired = shed_expired
+        self.pending = 0
+        self.expired = 0
+        
+        self._lock = threading.Lock()
+        self._queued = threading.Condition(self._lock)
+        self._queues: Dict[object, deque] = {}
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._shards: List[ProcessPoolExecutor] = []
+        self._unkeyed = 0
+        self._inline = threading.local()
+    
+    def _ensure_started(self):
+        # Executors are created lazily so a stopped bridge can start again
+        if self._threads is None:
+            # Process mode parks one thread per busy agent on its shard
+            threads = self.workers * 2 if self.backend == 'process' else self.workers
+            self._threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ue_bridge_worker')
+        if self.backend == 'process' and not self._shards:
+            self._shards = [
+                ProcessPoolExecutor(max_workers=1, initializer=self.initializer, initargs=self.initargs)
+                for _ in range(self.workers)
+            ]
+    
+    def submit(self, key, fn: Callable, *args, local: bool = False,
+               deadline: float = None, expired: Callable[[], Dict] = None) -> Future:
+        """Schedule fn(*args); work sharing a key runs strictly in order."""
+        return self._enqueue(key, _Task(Future(), fn, args, local, False, deadline, expired))
+    
+    def submit_batched(self, key, batch_fn: Callable, item, local: bool = False,
+                       deadline: float = None, expired: Callable[[], Dict] = None) -> Future:
+        """
+        Schedule one item for batch_fn(items) -> results. The future resolves
+        to this item's entry in the returned list.
+        """
+        return self._enqueue(key, _Task(Future(), batch_fn, (item,), local, True, deadline, expired))
+    
+    def _enqueue(self, key, task: _Task) -> Future:
+        with self._lock:
+            self._ensure_started()
+            self.pending += 1
+            
+            if key is None:
+                self._unkeyed += 1
+                key = ('__unkeyed__', self._unkeyed)
+            
+            inline = False
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.append(task)
+                if task.batched:
+                    self._queued.notify_all()
+            else:
+                self._queues[key] = deque([task])
+                inline = getattr(self._inline, 'active', False)
+                if not inline:
+                    self._threads.submit(self._drain, key)
+        
+        task.future.add_done_callback(self._done)
+        if inline:
+            self._run_own(key)
+        return task.future
+    
+    def run_inline(self, fn: Callable, *args):
+        """
+        Call fn(*args), running any work it submits for an idle key on this
+        thread. Busy keys still queue behind their strand, so ordering holds.
+        """
+        self._inline.active = True
+        try:
+            return fn(*args)
+        finally:
+            self._inline.active = False
+    
+    def _run_own(self, key):
+        """Run the inline caller's task; work queued behind it meanwhile goes back to the pool."""
+        with self._lock:
+            task = self._queues[key].popleft()
+        self._run([task], key)
+        with self._lock:
+            if self._queues[key]:
+                self._threads.submit(self._drain, key)
+            else:
+                del self._queues[key]
+    
+    def _shard_for(self, key) -> ProcessPoolExecutor:
+        return self._shards[zlib.crc32(str(key).encode()) % len(self._shards)]
+    
+    def _drain(self, key):
+        """Run queued work for one key until its queue is empty."""
+        while True:
+            with self._lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                task = queue.popleft()
+                batch = self._collect_batch(queue, task) if task.batched and self.max_batch > 1 else [task]
+            
+            now = time.monotonic()
+            shedding = self.shed_expired is None or self.shed_expired()
+            live = []
+            for queued in batch:
+                if shedding and queued.is_expired(now):
+                    self._expire(queued)
+                else:
+                    live.append(queued)
+            if live:
+                self._run(live, key)
+    
+    def _collect_batch(self, queue: deque, first: _Task) -> List[_Task]:
+        """Take consecutive batchable tasks, lingering up to batch_window for more. Lock held."""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        
+        while len(batch) < self.max_batch:
+            if queue:
+                nxt = queue[0]
+                if not nxt.batched or nxt.fn != first.fn or nxt.local != first.local:
+                    break  # Keep per-key ordering: never batch across other work
+                batch.append(queue.popleft())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._queued.wait(remaining)
+        
+        return batch
+    
+    def _expire(self, task: _Task):
+        with self._lock:
+            self.expired += 1
+        if task.future.set_running_or_notify_cancel():
+            try:
+                task.future.set_result(task.expired() if task.expired else None)
+            except BaseException as e:
+                task.future.set_exception(e)
+    
+    def _run(self, tasks: List[_Task], key):
+        first = tasks[0]
+        running = [task.future.set_running_or_notify_cancel() for task in tasks]
+        if not any(running):
+            return
+        
+        args = ([task.args[0] for task in tasks],) if first.batched else first.args
+        try:
+            if self.backend == 'process' and not first.local:
+                result = self._shard_for(key).submit(first.fn, *args).result()
+            else:
+                result = first.fn(*args)
+            results = result if first.batched else [result]
+            for task, still_wanted, item_result in zip(tasks, running, results):
+                if still_wanted:
+                    task.future.set_result(item_result)
+        except BaseException as e:
+            for task, still_wanted in zip(tasks, running):
+                if still_wanted and not task.future.done():
+                    task.future.set_exception(e)
+    
+    def _done(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+    
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            threads, shards = self._threads, self._shards
+            self._threads, self._shards = None, []
+        if threads is not None:
+            threads.shutdown(wait=wait)
+        for shard in shards:
+            shard.shutdown(wait=wait)
+
+
+class DeadlineTimer:
+    """Runs callbacks at time.monotonic() deadlines from one background thread."""
+    
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._sequence = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+    
+    def schedule(self, when: float, callback: Callable[[], None]):
+        with self._cond:
+            self._sequence += 1
+            heapq.heappush(self._heap, (when, self._sequence, callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='ue_bridge_deadlines')
+                self._thread.start()
+            self._cond.notify()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                _, _, callback = heapq.heappop(self._heap)
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Deadline callback failed: %s", e)
+
+
+def _settle(future: Future, result) -> bool:
+    """Resolve a future unless something else already did."""
+    try:
+        future.set_result(result)
+        return True
+    except InvalidStateError:
+        return False
+
+
+def _forward(source: Future, target: Future):
+    """Copy a finished future's outcome onto target, unless target is already settled."""
+    if source.exception() is not None:
+        try:
+            target.set_exception(source.exception())
+        except InvalidStateError:
+            pass
+    else:
+        _settle(target, source.result())
+
+
+class AdmissionController:
+    """
+    Global admission control for work dispatched to the worker pool.
+    
+    Commands fall into priority classes (lower is more important). Once pending
+    work reaches high_watermark the bridge is overloaded and sheds every class
+    at or above shed_priority until pending drains back to low_watermark.
+    max_pending is a hard cap that sheds everything.
+    """
+    
+    PRIORITIES = {
+        GameCommand.INPUT_RECEIVED.value: 0,
+        GameCommand.GAME_STATE_UPDATE.value: 0,
+        GameCommand.DECISION_REQUEST.value: 1,
+        GameCommand.DIALOGUE_REQUEST.value: 2,
+    }
+    DEFAULT_PRIORITY = 1
+    
+    def __init__(self, high_watermark: int = 256, low_watermark: int = 128, max_pending: int = 1024,
+                 shed_priority: int = 1, max_connections: int = 256):
+        if not low_watermark <= high_watermark <= max_pending:
+            raise ValueError("Expected low_watermark <= high_watermark <= max_pending")
+        
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.max_pending = max_pending
+        self.shed_priority = shed_priority
+        self.max_connections = max_connections
+        
+        self.overloaded = False
+        self.admitted = 0
+        self.shed: Dict[str, int] = {}
+        self.rejected_connections = 0
+        self._lock = threading.Lock()
+    
+    def priority(self, command: str) -> int:
+        return self.PRIORITIES.get(command, self.DEFAULT_PRIORITY)
+    
+    def admit(self, command: str, pending: int) -> bool:
+        """Decide whether new work for `command` may be queued behind `pending` items."""
+        with self._lock:
+            if pending >= self.high_watermark:
+                self.overloaded = True
+            elif pending <= self.low_watermark:
+                self.overloaded = False
+            
+            if pending >= self.max_pending or (self.overloaded and self.priority(command) >= self.shed_priority):
+                self.shed[command] = self.shed.get(command, 0) + 1
+                return False
+            
+            self.admitted += 1
+            return True
+    
+    def admit_connection(self, active: int) -> bool:
+        if active < self.max_connections:
+            return True
+        with self._lock:
+            self.rejected_connections += 1
+        return False
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'overloaded': self.overloaded,
+                'admitted': self.admitted,
+                'shed': dict(self.shed),
+                'rejected_connections': self.rejected_connections
+            }
+
+
+def canonical_hash(*parts) -> str:
+    """Stable hash of JSON-like values; dict key order doesn't matter."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+class DecisionCache:
+    """
+    TTL + LRU cache for decision responses.
+    
+    Keys are a canonical hash of (agent_name, options, context). Entries expire
+    after ttl seconds and the least recently used ones are evicted once
+    max_entries or max_bytes is exceeded. Invalidating an agent drops all of its
+    entries and bumps its generation, so a decision computed before the agent
+    learned something is never stored after the fact.
     """
     
-    def __init__(self, ue_project_path: str = None, port: int = 6969):
-        self.ue_project_path = ue_project_path or self._find_ue_project()
-        self.port = port
-        self.socket = None
-        self.running = False
-        self.message_queue = []
-        self.request_handlers: Dict[str, Callable] = {}
-        self.consciousness_bridge = None
+    def __init__(self, ttl: float = 1.0, max_entries: int = 4096, max_bytes: int = 8 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.size_bytes = 0
+        
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (agent, expires, size, response)
+        self._agent_keys: Dict[str, set] = {}
+        self._generations: Dict[str, int] = {}
+    
+    @staticmethod
+    def key_for(agent_name: str, options: List, context: Dict) -> str:
+        return canonical_hash(agent_name, options, context)
+    
+    def generation(self, agent_name: str) -> int:
+        return self._generations.get(agent_name, 0)
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[3])
+    
+    def put(self, agent_name: str, key: str, response: Dict, generation: int = None):
+        """Store a response; skipped if the agent was invalidated since `generation`."""
+        size = len(key) + len(json.dumps(response, default=str))
+        with self._lock:
+            if generation is not None and generation != self.generation(agent_name):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (agent_name, time.monotonic() + self.ttl, size, response)
+            self._agent_keys.setdefault(agent_name, set()).add(key)
+            self.size_bytes += size
+            
+            while self._entries and (len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def invalidate(self, agent_name: str):
+        """Forget every cached decision for an agent."""
+        with self._lock:
+            self._generations[agent_name] = self.generation(agent_name) + 1
+            for key in self._agent_keys.pop(agent_name, ()):
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self.size_bytes -= entry[2]
+            self.invalidations += 1
+    
+    def _remove(self, key: str):
+        agent_name, _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+        keys = self._agent_keys.get(agent_name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._agent_keys[agent_name]
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'entries': len(self._entries),
+            'size_bytes': self.size_bytes
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls onto one in-flight computation.
+    
+    The first caller for a key runs the work; callers arriving while it is
+    still running share its result instead of computing it again. Keys can be
+    grouped (by agent) so a state change can stop new callers from joining
+    computations that started before it.
+    """
+    
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._groups: Dict[object, set] = {}
+    
+    def join(self, key: str, start: Callable[[], Future], group=None) -> Future:
+        """
+        Return the in-flight future for key, or start() a new one.
+        start() runs outside the lock, since it may do the work on this thread.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = Future()
+            self._track(key, future, group)
+        
+        future.add_done_callback(lambda f: self._finish(key, f, group))
+        try:
+            work = start()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        work.add_done_callback(lambda f: _forward(f, future))
+        return future
+    
+    def do(self, key: str, fn: Callable[[], Dict], group=None) -> Dict:
+        """Synchronous form of join(): run fn() or wait for the identical call already running."""
+        with self._lock:
+            existing = self._calls.get(key)
+            if existing is None:
+                future = Future()
+                self._track(key, future, group)
+            else:
+                self.coalesced += 1
+        
+        if existing is not None:
+            return dict(existing.result())
+        
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._finish(key, future, group)
+        return future.result()
+    
+    def forget(self, group):
+        """New callers in this group start fresh; running work still completes."""
+        with self._lock:
+            for key in self._groups.pop(group, ()):
+                self._calls.pop(key, None)
+    
+    def _track(self, key: str, future: Future, group):
+        # Lock held
+        self.leaders += 1
+        self._calls[key] = future
+        if group is not None:
+            self._groups.setdefault(group, set()).add(key)
+    
+    def _finish(self, key: str, future: Future, group):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+                keys = self._groups.get(group)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._groups[group]
+    
+    def stats(self) -> Dict:
+        return {
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls)
+        }
+
+
+class InputAggregator:
+    """
+    Debounces INPUT_RECEIVED events.
+    
+    Events are buffered per (agent_name, input_type) and, once per window,
+    each bucket is flushed as a single merged input whose magnitude grows
+    with the number of events it stands for (base_magnitude * sqrt(count),
+    capped at max_magnitude). The latest event's parameters win, which is
+    what axis input wants.
+    """
+    
+    def __init__(self, window: float = 0.05, base_magnitude: float = 0.5, max_magnitude: float = 1.0):
+        self.window = window
+        self.base_magnitude = base_magnitude
+        self.max_magnitude = max_magnitude
+        
+        self.received = 0
+        self.flushed = 0
+        
+        self._lock = threading.Lock()
+        self._buckets: Dict[tuple, Dict] = {}
+        self._apply: Optional[Callable[[Dict], Future]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+    
+    def attach(self, apply: Callable[[Dict], Future]):
+        """Set where merged inputs go; apply(message) returns a future."""
+        self._apply = apply
+    
+    def add(self, message: Dict):
+        key = (message.get('agent_name'), message.get('input_type'))
+        with self._lock:
+            self.received += 1
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = {'count': 1, 'parameters': message.get('parameters', {})}
+            else:
+                bucket['count'] += 1
+                bucket['parameters'] = message.get('parameters', bucket['parameters'])
+            
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while not self._stopping.wait(self.window):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Input flush error: %s", e)
+    
+    def flush(self) -> List[Future]:
+        """Send every buffered bucket on as one merged input."""
+        with self._lock:
+            buckets, self._buckets = self._buckets, {}
+        
+        futures = []
+        for (agent_name, input_type), bucket in buckets.items():
+            count = bucket['count']
+            futures.append(self._apply({
+                'command': GameCommand.INPUT_RECEIVED.value,
+                'agent_name': agent_name,
+                'input_type': input_type,
+                'parameters': bucket['parameters'],
+                'count': count,
+                'magnitude': min(self.max_magnitude, self.base_magnitude * count ** 0.5)
+            }))
+            self.flushed += 1
+        return futures
+    
+    def stop(self) -> List[Future]:
+        """Stop the flusher and flush whatever is still buffered."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stopping.set()
+        if thread is not None:
+            thread.join()
+        return self.flush()
+    
+    def stats(self) -> Dict:
+        return {
+            'received': self.received,
+            'flushed': self.flushed,
+            'buffered': len(self._buckets)
+        }
+
+
+class OutboundChannel:
+    """
+    Long-lived connection pool for pushing messages to the UE editor.
+    
+    Messages are encoded once and queued in a bounded buffer (the oldest are
+    dropped when it is full, since newer state supersedes them). Background
+    writers send whatever is queued in a single sendall, and reconnect with
+    backoff when the editor goes away. Framing defaults to NDJSON because the
+    connection no longer closes after each message.
+    """
+    
+    MAX_WRITE_BYTES = 256 * 1024
+    
+    def __init__(self, host: str = 'localhost', port: int = 6970, connections: int = 1,
+                 max_queue: int = 4096, framing: WireFraming = WireFraming.NDJSON,
+                 connect_timeout: float = 1.0, max_backoff: float = 2.0,
+                 codec: MessageCodec = JSON_CODEC):
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.framing = framing
+        self.codec = codec
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+        
+        self.sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self.connected = 0
+        
+        self._queue: deque = deque()
+        self._busy = 0
+        self._closing = False
+        self._cond = threading.Condition()
+        self._writers = [
+            threading.Thread(target=self._writer, daemon=True, name=f'ue_outbound_{port}_{i}')
+            for i in range(connections)
+        ]
+        for writer in self._writers:
+            writer.start()
+    
+    def send(self, message: Dict) -> bool:
+        """Queue one message; False if the channel is closed."""
+        return self.send_many([message]) == 1
+    
+    def send_many(self, messages: List[Dict]) -> int:
+        """Queue several messages at once; returns how many were accepted."""
+        frames = [encode_frame(message, self.framing, self.codec) for message in messages]
+        with self._cond:
+            if self._closing:
+                return 0
+            self._queue.extend(frames)
+            self._trim()
+            self._cond.notify()
+        return len(frames)
+    
+    def _trim(self):
+        # Lock held
+        while len(self._queue) > self.max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+    
+    def _writer(self):
+        sock = None
+        backoff = 0.05
+        
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                
+                batch, size = [], 0
+                while self._queue and size < self.MAX_WRITE_BYTES:
+                    frame = self._queue.popleft()
+                    batch.append(frame)
+                    size += len(frame)
+                self._busy += 1
+            
+            try:
+                if sock is None:
+                    sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    sock.settimeout(None)
+                    with self._cond:
+                        self.connected += 1
+                    backoff = 0.05
+                
+                sock.sendall(b''.join(batch))
+                with self._cond:
+                    self.sent += len(batch)
+                    self.bytes_sent += size
+            
+            except OSError as e:
+                if sock is not None:
+                    sock.close()
+                    sock = None
+                    with self._cond:
+                        self.connected -= 1
+                        self.reconnects += 1
+                logger.error("Failed to send to UE at %s:%s: %s", self.host, self.port, e)
+                
+                with self._cond:
+                    if self._closing:
+                        self.dropped += len(batch) + len(self._queue)
+                        self._queue.clear()
+                    else:
+                        # Put the batch back in front and retry after a backoff
+                        self._queue.extendleft(reversed(batch))
+                        self._trim()
+                if not self._closing:
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+            
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._cond.notify_all()
+        
+        if sock is not None:
+            sock.close()
+            with self._cond:
+                self.connected -= 1
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything queued has been written (or dropped)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+    
+    def close(self, timeout: float = 2.0):
+        """Write what is queued (within timeout), then close the connections."""
+        self.flush(timeout)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        for writer in self._writers:
+            writer.join(timeout)
+    
+    def stats(self) -> Dict:
+        return {
+            'sent': self.sent,
+            'bytes_sent': self.bytes_sent,
+            'dropped': self.dropped,
+            'reconnects': self.reconnects,
+            'connections': len(self._writers),
+            'connected': self.connected,
+            'queue_depth': len(self._queue),
+            'queue_capacity': self.max_queue
+        }
+
+
+def _seq_newer(seq: int, last: int) -> bool:
+    """Serial-number comparison (RFC 1982) so 32-bit sequence counters can wrap."""
+    delta = (seq - last) % 0x100000000
+    return 0 < delta < 0x80000000
+
+
+class LatestValueGate:
+    """
+    Sequencing and latest-value-wins coalescing for unreliable updates.
+    
+    offer() drops a packet whose seq is not newer than the last one seen on its
+    stream (sender, command, agent_name); packets without a seq are never
+    stale. An accepted update goes straight to the handler unless one for the
+    same (command, agent_name, input_type) is still being handled; then it
+    waits in a one-slot mailbox where newer updates of that type replace it.
+    Different input types are separate values, so a jump never supersedes a move.
+    """
+    
+    def __init__(self, handler: Callable[[Dict], Future]):
+        self.handler = handler
+        self.received = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.dispatched = 0
+        
+        self._lock = threading.Lock()
+        self._last_seq: Dict[tuple, int] = {}
+        self._busy: Dict[tuple, Optional[Dict]] = {}
+    
+    def offer(self, sender, message: Dict) -> str:
+        """Returns "dispatched", "coalesced" or "stale"."""
+        key = (message.get('command'), message.get('agent_name'), message.get('input_type'))
+        seq = message.get('seq')
+        
+        with self._lock:
+            self.received += 1
+            if seq is not None:
+                stream = (sender,) + key[:2]
+                last = self._last_seq.get(stream)
+                if last is not None and not _seq_newer(seq, last):
+                    self.stale += 1
+                    return 'stale'
+                self._last_seq[stream] = seq
+            
+            if key in self._busy:
+                if self._busy[key] is not None:
+                    self.coalesced += 1  # The waiting update is superseded
+                self._busy[key] = message
+                return 'coalesced'
+            self._busy[key] = None
+        
+        self._start(key, message)
+        return 'dispatched'
+    
+    def _start(self, key: tuple, message: Dict):
+        with self._lock:
+            self.dispatched += 1
+        try:
+            future = self.handler(message)
+        except Exception as e:
+            logger.error("Datagram handler error: %s", e)
+            self._finished(key)
+            return
+        future.add_done_callback(lambda f: self._finished(key))
+    
+    def _finished(self, key: tuple):
+        with self._lock:
+            waiting = self._busy.get(key)
+            if waiting is None:
+                del self._busy[key]
+                return
+            self._busy[key] = None
+        self._start(key, waiting)
+    
+    def stats(self) -> Dict:
+        return {
+            'received': self.received,
+            'stale': self.stale,
+            'coalesced': self.coalesced,
+            'dispatched': self.dispatched,
+        }
+
+
+class DatagramSender:
+    """
+    Fire-and-forget UDP pushes to the editor for loss-tolerant state.
+    
+    Each message gets a sequence number so the receiver can drop reordered or
+    duplicated packets; a lost packet is simply superseded by the next update,
+    so nothing ever waits behind it.
+    """
+    
+    MAX_DATAGRAM_SIZE = 1400  # Stay under a typical MTU so packets are not fragmented
+    
+    def __init__(self, host: str = 'localhost', port: int = 6972, codec: MessageCodec = JSON_CODEC):
+        self.host = host
+        self.port = port
+        self.codec = codec
+        self.sent = 0
+        self.oversized = 0
+        
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+    
+    def send(self, message: Dict) -> bool:
+        """False if the message is too big for one datagram or the socket buffer is full."""
+        with self._lock:
+            self._seq = (self._seq + 1) % 0x100000000
+            payload = self.codec.encode(dict(message, seq=self._seq))
+            if len(payload) > self.MAX_DATAGRAM_SIZE:
+                self.oversized += 1
+                return False
+            try:
+                self._socket.sendto(payload, (self.host, self.port))
+            except (BlockingIOError, OSError):
+                return False
+            self.sent += 1
+            return True
+    
+    def close(self):
+        self._socket.close()
+    
+    def stats(self) -> Dict:
+        return {'sent': self.sent, 'oversized': self.oversized, 'seq': self._seq}
+
+
+class Subscriber:
+    """
+    One connection's view of pushed updates: a coalescing mailbox.
+    
+    Pending pushes are keyed by (topic, agent_name), so while a slow consumer
+    is still being written to, newer updates replace older unsent ones. The
+    owner is woken once per batch via `wake` and drains with take().
+    """
+    
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.pushed = 0
+        self.coalesced = 0
+        self.closed = False
+        
+        self._pending: OrderedDict = OrderedDict()
+        self._scheduled = False
+        self._lock = threading.Lock()
+    
+    def offer(self, topic: str, agent_name: str, push: Dict):
+        with self._lock:
+            if self.closed:
+                return
+            key = (topic, agent_name)
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = push  # Keeps its original slot, so no key starves
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.wake()
+    
+    def take(self) -> List[Dict]:
+        """Everything pending, oldest key first; empty once drained (re-arms wake)."""
+        with self._lock:
+            pushes = list(self._pending.values())
+            self._pending.clear()
+            self.pushed += len(pushes)
+            if not pushes:
+                self._scheduled = False
+            return pushes
+    
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._pending.clear()
+
+
+class SubscriptionHub:
+    """
+    Routes published updates to subscribers by (topic, agent_name).
+    
+    agent_name "*" subscribes to every agent. Pushes look like
+      {"push": topic, "agent_name": ..., "seq": n, "data": {...}}
+    and never carry a request_id, so clients can tell them from responses.
+    """
+    
+    TOPICS = (
+        AIResponse.CHARACTER_ACTION.value,
+        AIResponse.EMOTION_STATE.value,
+        AIResponse.TRAIT_UPDATE.value,
+    )
+    
+    def __init__(self):
+        self.published = 0
+        self._seq = 0
+        self._routes: Dict[tuple, set] = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, subscriber: Subscriber, agent_name: str, topics: List[str]) -> List[str]:
+        unknown = [topic for topic in topics if topic not in self.TOPICS]
+        if unknown:
+            raise ValueError(f"Unknown topics: {', '.join(unknown)}")
+        with self._lock:
+            for topic in topics:
+                self._routes.setdefault((topic, agent_name), set()).add(subscriber)
+        return list(topics)
+    
+    def unsubscribe(self, subscriber: Subscriber, agent_name: str = None, topics: List[str] = None):
+        """Drop matching routes; no agent_name/topics means all of them."""
+        with self._lock:
+            for key in list(self._routes):
+                topic, agent = key
+                if (agent_name is None or agent == agent_name) and (topics is None or topic in topics):
+                    self._routes[key].discard(subscriber)
+                    if not self._routes[key]:
+                        del self._routes[key]
+    
+    def remove(self, subscriber: Subscriber):
+        subscriber.close()
+        self.unsubscribe(subscriber)
+    
+    def has_subscribers(self, topic: str, agent_name: str) -> bool:
+        routes = self._routes
+        return bool(routes.get((topic, agent_name)) or routes.get((topic, '*')))
+    
+    def publish(self, topic: str, agent_name: str, data: Dict) -> int:
+        """Queue an update for every matching subscriber; returns how many."""
+        with self._lock:
+            targets = self._routes.get((topic, agent_name), set()) | self._routes.get((topic, '*'), set())
+            if not targets:
+                return 0
+            self._seq += 1
+            self.published += 1
+            push = {'push': topic, 'agent_name': agent_name, 'seq': self._seq, 'data': data}
+        for subscriber in targets:
+            subscriber.offer(topic, agent_name, push)
+        return len(targets)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            subscribers = set().union(*self._routes.values()) if self._routes else set()
+        return {
+            'subscribers': len(subscribers),
+            'published': self.published,
+            'pushed': sum(s.pushed for s in subscribers),
+            'coalesced': sum(s.coalesced for s in subscribers),
+        }
+
+
+class WorldStateStore:
+    """
+    Server-side copy of the game world, keyed by agent and entity.
+    
+    UE sends a full snapshot once ({"version": n, "full": true, "entities": {...}})
+    and then deltas against the version it last sent ({"base_version": n,
+    "version": n + 1, "entities": {id: {changed fields}}, "removed": [ids]}).
+    A field set to null is removed from its entity. Deltas whose base_version
+    doesn't match the stored version are rejected so UE can resync.
+    """
+    
+    def __init__(self):
+        self.full_updates = 0
+        self.deltas = 0
+        self.resyncs = 0
+        
+        self._lock = threading.Lock()
+        self._worlds: Dict[object, Dict[str, Dict]] = {}
+        self._versions: Dict[object, int] = {}
+    
+    def version(self, agent_name=None) -> Optional[int]:
+        return self._versions.get(agent_name)
+    
+    def apply(self, message: Dict) -> Dict:
+        """Apply a full update or delta from UE; returns the response for the client."""
+        agent_name = message.get('agent_name')
+        version = message.get('version')
+        entities = message.get('entities', {})
+        
+        with self._lock:
+            current = self._versions.get(agent_name)
+            
+            if message.get('full'):
+                self._worlds[agent_name] = {eid: dict(fields) for eid, fields in entities.items()}
+                self._versions[agent_name] = version
+                self.full_updates += 1
+                return {'status': 'ok', 'version': version}
+            
+            base_version = message.get('base_version')
+            if current is None or base_version != current:
+                # We missed an update (or never had a snapshot): ask for a full one
+                self.resyncs += 1
+                return {'status': 'resync', 'agent_name': agent_name, 'version': current}
+            
+            world = self._worlds[agent_name]
+            for eid, fields in entities.items():
+                entity = world.setdefault(eid, {})
+                for field, value in fields.items():
+                    if value is None:
+                        entity.pop(field, None)
+                    else:
+                        entity[field] = value
+            for eid in message.get('removed', ()):
+                world.pop(eid, None)
+            
+            self._versions[agent_name] = version
+            self.deltas += 1
+            return {'status': 'ok', 'version': version}
+    
+    def snapshot(self, agent_name=None) -> Dict:
+        """Copy of one agent's world: {"version": n, "entities": {...}}."""
+        with self._lock:
+            world = self._worlds.get(agent_name, {})
+            return {
+                'version': self._versions.get(agent_name),
+                'entities': {eid: dict(fields) for eid, fields in world.items()}
+            }
+    
+    def entity(self, agent_name, entity_id: str) -> Optional[Dict]:
+        with self._lock:
+            fields = self._worlds.get(agent_name, {}).get(entity_id)
+            return dict(fields) if fields is not None else None
+    
+    def stats(self) -> Dict:
+        return {
+            'full_updates': self.full_updates,
+            'deltas': self.deltas,
+            'resyncs': self.resyncs,
+            'worlds': len(self._worlds),
+            'entities': sum(len(world) for world in self._worlds.values())
+        }
+
+
+class TrafficRecorder:
+    """
+    Append-only log of inbound messages and their responses, for replay.
+    
+    One compact JSON record per line, paired by sequence number:
+      {"t": unix time, "s": seq, "in": message}
+      {"t": unix time, "s": seq, "out": response, "ms": handler time}
+    
+    Files rotate by size like logging's RotatingFileHandler (traffic.log.1 is
+    the previous file, up to `backups` of them); read_traffic() walks them
+    oldest first.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, backups: int = 5):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.records = 0
+        self.rotations = 0
+        
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+    
+    def record_in(self, message: Dict) -> int:
+        """Record an inbound message; returns the sequence number for its response."""
+        with self._lock:
+            self._seq += 1
+            self._write({'t': round(time.time(), 6), 's': self._seq, 'in': message})
+            return self._seq
+    
+    def record_out(self, seq: int, response, elapsed: float):
+        with self._lock:
+            self._write({'t': round(time.time(), 6), 's': seq, 'out': response, 'ms': round(elapsed * 1000, 3)})
+    
+    def _write(self, record: Dict):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+        self.records += 1
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+    
+    def _rotate(self):
+        self._file.close()
+        if self.backups:
+            for index in range(self.backups - 1, 0, -1):
+                source = self.path.with_name(f'{self.path.name}.{index}')
+                if source.exists():
+                    source.replace(self.path.with_name(f'{self.path.name}.{index + 1}'))
+            self.path.replace(self.path.with_name(f'{self.path.name}.1'))
+        else:
+            self.path.unlink()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.rotations += 1
+    
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def stats(self) -> Dict:
+        return {'records': self.records, 'rotations': self.rotations}
+
+
+def read_traffic(path: str) -> Iterator[Dict]:
+    """Yield records written by TrafficRecorder, oldest first across rotated files."""
+    path = Path(path)
+    rotated = [p for p in path.parent.glob(f'{path.name}.*') if p.suffix[1:].isdigit()]
+    rotated.sort(key=lambda p: int(p.suffix[1:]), reverse=True)
+    for file_path in rotated + [path]:
+        if not file_path.exists():
+            continue
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds), cheap enough for the message path."""
+    __slots__ = ('counts', 'sum', 'count')
+    
+    BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+               0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class BridgeMetrics:
+    """
+    Hot-path counters and per-command stage histograms for UnrealBridge.
+    
+    Stages are "decode", "handler" (dispatch until the response is ready,
+    including queueing) and "encode". Everything is guarded by one lock held
+    only for a few increments, so it is fine to leave on in production.
+    """
+    
+    def __init__(self):
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.messages: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._stages: Dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, stage: str, command, seconds: float):
+        key = (stage, command or 'unknown')
+        with self._lock:
+            histogram = self._stages.get(key)
+            if histogram is None:
+                histogram = self._stages[key] = Histogram()
+            histogram.observe(seconds)
+    
+    def observe_decode(self, messages: List[Dict], seconds: float):
+        """Decode cost comes per read, so it is split evenly across the messages it produced."""
+        share = seconds / len(messages)
+        with self._lock:
+            for message in messages:
+                command = message.get('command') or 'unknown'
+                self.messages[command] = self.messages.get(command, 0) + 1
+                key = ('decode', command)
+                histogram = self._stages.get(key)
+                if histogram is None:
+                    histogram = self._stages[key] = Histogram()
+                histogram.observe(share)
+    
+    def received(self, nbytes: int):
+        with self._lock:
+            self.bytes_in += nbytes
+    
+    def sent(self, nbytes: int):
+        with self._lock:
+            self.bytes_out += nbytes
+    
+    def error(self, kind: str):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+    
+    def render(self, gauges: Dict[str, float] = None, counters: Dict[str, float] = None) -> str:
+        """Prometheus text exposition format; counters are monotonic and named *_total."""
+        with self._lock:
+            stages = [(key, list(h.counts), h.sum, h.count) for key, h in sorted(self._stages.items())]
+            messages = dict(self.messages)
+            errors = dict(self.errors)
+            bytes_in, bytes_out = self.bytes_in, self.bytes_out
+        
+        lines = [
+            '# HELP ue_bridge_stage_seconds Time spent per message stage.',
+            '# TYPE ue_bridge_stage_seconds histogram',
+        ]
+        for (stage, command), counts, total, count in stages:
+            labels = f'stage="{stage}",command="{command}"'
+            cumulative = 0
+            for bound, bucket in zip(Histogram.BUCKETS, counts):
+                cumulative += bucket
+                lines.append(f'ue_bridge_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'ue_bridge_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'ue_bridge_stage_seconds_sum{{{labels}}} {total}')
+            lines.append(f'ue_bridge_stage_seconds_count{{{labels}}} {count}')
+        
+        lines += ['# HELP ue_bridge_messages_total Messages received per command.',
+                  '# TYPE ue_bridge_messages_total counter']
+        lines += [f'ue_bridge_messages_total{{command="{c}"}} {n}' for c, n in sorted(messages.items())]
+        
+        lines += ['# HELP ue_bridge_errors_total Errors by kind.',
+                  '# TYPE ue_bridge_errors_total counter']
+        lines += [f'ue_bridge_errors_total{{kind="{k}"}} {n}' for k, n in sorted(errors.items())]
+        
+        lines += ['# TYPE ue_bridge_bytes_received_total counter', f'ue_bridge_bytes_received_total {bytes_in}',
+                  '# TYPE ue_bridge_bytes_sent_total counter', f'ue_bridge_bytes_sent_total {bytes_out}']
+        
+        typed = set()
+        for kind, values in (('counter', counters), ('gauge', gauges)):
+            for name, value in (values or {}).items():
+                metric = name.split('{')[0]
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f'# TYPE {metric} {kind}')
+                lines.append(f'{name} {value}')
+        
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics for the bridge attached to the server."""
+    
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.bridge.get_metrics().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # Scrapes are not worth a log line each
+
+
+# Bridge used inside process-backend workers; built once per worker process
+_worker_bridge = None
+
+
+def _init_process_worker(consciousness_factory: Callable, ue_project_path: str):
+    global _worker_bridge
+    _worker_bridge = UnrealBridge(ue_project_path)
+    _worker_bridge.connect_consciousness(consciousness_factory())
+
+
+def _process_in_worker(message: Dict) -> Dict:
+    return _worker_bridge.process_message(message)
+
+
+def _process_decision_batch_in_worker(messages: List[Dict]) -> List[Dict]:
+    return _worker_bridge._handle_decision_batch(messages)
+
+
+class _ResponseWriter:
+    """
+    Writes a connection's pipelined responses from its own thread.
+    
+    Futures are settled on worker strands and the deadline timer; their done
+    callbacks only enqueue here, so a client that stops reading blocks its
+    own writer and nothing else.
+    """
+    
+    def __init__(self, respond: Callable[[Dict, Future], None], name: str):
+        self._respond = respond
+        self._queue = queue.SimpleQueue()
+        threading.Thread(target=self._run, daemon=True, name=name).start()
+    
+    def when_done(self, message: Dict, future: Future):
+        """Call respond(message, future) on the writer thread once future settles."""
+        future.add_done_callback(lambda f: self._queue.put((message, f)))
+    
+    def close(self):
+        """Stop after the responses already queued."""
+        self._queue.put(None)
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._respond(*item)
+
+
+class UnrealBridge:
+    """
+    Main bridge between Unreal Engine and Python consciousness system.
+    """
+    
+    RECV_BUFFER_SIZE = 64 * 1024
+    _PUSH = {'command': 'push'}  # Metrics label for pushed updates
+    # Accepted over UDP by default: latest-value state where a lost packet is superseded anyway
+    DATAGRAM_COMMANDS = frozenset({GameCommand.INPUT_RECEIVED.value})
+    
+    def __init__(self, ue_project_path: str = None, port: int = 6969, backlog: int = 128,
+                 max_pipelined: int = 64, workers: int = None, worker_backend: str = 'thread',
+                 consciousness_factory: Callable = None, decision_batch_size: int = 1,
+                 decision_batch_window: float = 0.002, decision_cache: DecisionCache = None,
+                 input_aggregator: InputAggregator = None, outbound_options: Dict = None,
+                 admission: AdmissionController = None, command_deadlines: Dict[str, float] = None,
+                 log_sampler: LogSampler = None, recorder: TrafficRecorder = None):
+        self.ue_project_path = ue_project_path or self._find_ue_project()
+        self.port = port
+        self.backlog = backlog
+        self.max_pipelined = max_pipelined  # In-flight tagged requests per connection
+        self.socket = None
+        self.running = False
+        self.request_handlers: Dict[str, Callable] = {}
+        self.consciousness_bridge = None
+        self.decision_cache = decision_cache
+        self.world_state = WorldStateStore()
+        
+        # Per-command default deadlines in ms (a message's own deadline_ms wins).
+        # Past its deadline a request gets a fallback response while the real
+        # computation finishes in the background and warms the cache.
+        self.command_deadlines = command_deadlines or {}
+        self.timeouts: Dict[str, int] = {}
+        self._timeouts_lock = threading.Lock()  # Written from the deadline timer thread
+        self.last_decisions: Dict[str, Dict] = {}
+        self._deadlines = DeadlineTimer()
+        
+        self.metrics = BridgeMetrics()
+        self._metrics_server: Optional[ThreadingHTTPServer] = None
+        # Per-message log lines go through this; see configure_logging for the async writer
+        self.log_sampler = log_sampler or LogSampler()
+        # Optional capture of every dispatched message and response; see read_traffic
+        self.recorder = recorder
+        self._datagram_socket: Optional[socket.socket] = None
+        self._datagram_thread: Optional[threading.Thread] = None
+        self._datagram_senders: Dict[tuple, DatagramSender] = {}
+        self.datagram_gate = LatestValueGate(self.dispatch)
+        # Per-connection pushes; see publish() and the subscribe command
+        self.subscriptions = SubscriptionHub()
+        self._last_emotions: Dict[str, str] = {}
+        self._shm_channels: List[SharedMemoryChannel] = []
+        self._shm_threads: List[threading.Thread] = []
+        self._shm_stop = threading.Event()
+        
+        # Bounded queues and load shedding; see AdmissionController
+        self.admission = admission or AdmissionController()
+        self.active_connections = 0
+        self._connections_lock = threading.Lock()
+        
+        # Identical concurrent decision/dialogue requests share one computation:
+        # one group coalesces queued work at dispatch(), the other direct
+        # process_message() callers. Kept apart so a dispatched leader can't
+        # end up waiting on itself.
+        self.single_flight = SingleFlight()
+        self._direct_flight = SingleFlight()
+        
+        # Optional debouncing of INPUT_RECEIVED; merged inputs re-enter through the worker pool
+        self.input_aggregator = input_aggregator
+        if input_aggregator is not None:
+            input_aggregator.attach(self._apply_aggregated_input)
+        
+        # Pooled connections to the editor for send_to_ue(), created on first use.
+        # outbound_options are passed to OutboundChannel (connections, max_queue, framing, ...)
+        self.outbound_options = outbound_options or {}
+        self._outbound: Dict[tuple, OutboundChannel] = {}
+        self._outbound_lock = threading.Lock()
+        
+        # asyncio server state (only used in mode="asyncio")
+        self.server_mode = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_server = None
+        self._server_thread: Optional[threading.Thread] = None
+        
+        # Handler work runs here, off the network loop, ordered per agent.
+        # The process backend needs a picklable consciousness_factory so each
+        # worker process can build its own collective. Work queued past its
+        # deadline still runs (warming the cache and last_decisions) unless
+        # the bridge is overloaded; the caller already got its fallback.
+        shed_expired = lambda: self.admission.overloaded
+        if worker_backend == 'process':
+            if consciousness_factory is None:
+                raise ValueError("worker_backend='process' requires a consciousness_factory")
+            # Decisions are computed (and invalidated) inside the worker processes,
+            # so a cache held here would never be read or filled
+            if decision_cache is not None:
+                raise ValueError("decision_cache is not supported with worker_backend='process'")
+            self.workers = WorkerPool(workers, 'process', _init_process_worker,
+                                      (consciousness_factory, self.ue_project_path),
+                                      max_batch=decision_batch_size, batch_window=decision_batch_window,
+                                      shed_expired=shed_expired)
+        else:
+            self.workers = WorkerPool(workers, worker_backend, max_batch=decision_batch_size,
+                                      batch_window=decision_batch_window, shed_expired=shed_expired)
+        
+        logger.info("UnrealBridge initialized for project: %s", self.ue_project_path)
+    
+    def _find_ue_project(self) -> str:
+        """Auto-detect Unreal project in workspace."""
+        # Check common locations
+        possible_paths = [
+            r"c:\Users\Busin\OneDrive\Aura_Prime\GameProject",
+            r"c:\Users\Busin\OneDrive\Aura_Prime\VIBE_MIRACLE\game",
+            r"c:\Users\Busin\OneDrive\Aura_Prime\MyGameProject"
+        ]
+        
+        for path in possible_paths:
+            if os.path.exists(path):
+                if any(f.endswith('.uproject') for f in os.listdir(path)):
+                    return path
+        
+        logger.warning("Could not auto-detect UE project, using default")
+        return r"c:\Users\Busin\OneDrive\Aura_Prime\GameProject"
+    
+    def connect_consciousness(self, consciousness_system):
+        """Link to VIBE MIRACLE consciousness system."""
+        self.consciousness_bridge = consciousness_system
+        logger.info("Connected to consciousness system (VIBE MIRACLE)")
+    
+    def register_handler(self, command_type: str, handler: Callable):
+        """Register a handler for a specific command type."""
+        self.request_handlers[command_type] = handler
+        logger.info("Registered handler for: %s", command_type)
+    
+    def start_server(self, host: str = 'localhost', mode: str = 'thread', backlog: int = None):
+        """
+        Start listening for messages from UE4.
+        
+        mode="thread" spawns one handler thread per connection;
+        mode="asyncio" runs every connection on a single event loop.
+        """
+        if mode == 'asyncio':
+            return self.start_async_server(host, backlog)
+        if mode != 'thread':
+            raise ValueError(f"Unknown server mode: {mode}")
+        
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((host, self.port))
+        self.socket.listen(backlog or self.backlog)
+        self.running = True
+        self.server_mode = 'thread'
+        
+        logger.info("UE Bridge listening on %s:%s", host, self.port)
+        
+        # Start listener in background thread
+        listener_thread = threading.Thread(target=self._listen, daemon=True)
+        listener_thread.start()
+    
+    def start_async_server(self, host: str = 'localhost', backlog: int = None):
+        """
+        Start an asyncio server for UE4 connections.
+        The event loop runs in a background thread so this returns immediately,
+        just like start_server().
+        """
+        ready = threading.Event()
+        startup = {}
+        self.running = True
+        self.server_mode = 'asyncio'
+        
+        self._server_thread = threading.Thread(
+            target=self._run_event_loop,
+            args=(host, backlog or self.backlog, ready, startup),
+            daemon=True
+        )
+        self._server_thread.start()
+        ready.wait()
+        
+        if 'error' in startup:
+            self.running = False
+            raise startup['error']
+        
+        logger.info("UE Bridge (asyncio) listening on %s:%s", host, self.port)
+    
+    def _run_event_loop(self, host: str, backlog: int, ready: threading.Event, startup: Dict):
+        """Own the asyncio event loop for the lifetime of the server."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        
+        try:
+            self._async_server = loop.run_until_complete(asyncio.start_server(
+                self._handle_async_connection, host, self.port,
+                backlog=backlog, reuse_address=True
+            ))
+        except Exception as e:
+            startup['error'] = e
+            loop.close()
+            ready.set()
+            return
+        
+        self._loop = loop
+        ready.set()
+        
+        try:
+            loop.run_forever()
+        finally:
+            self._async_server.close()
+            
+            # Drop any connection still open so wait_closed() can't hang
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(self._async_server.wait_closed())
+            loop.close()
+            self._loop = None
+    
+    def _listen(self):
+        """Listen for incoming messages from UE4."""
+        while self.running:
+            try:
+                conn, addr = self.socket.accept()
+                logger.info("Connected from %s", addr)
+                
+                # Pipelined responses are small; don't let Nagle hold them back
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                
+                if not self._connection_opened():
+                    logger.warning("Rejected connection from %s: too many connections", addr)
+                    conn.sendall(encode_frame({'status': 'overloaded'}))
+                    conn.close()
+                    continue
+                
+                # Handle this connection
+                handler_thread = threading.Thread(
+                    target=self._handle_connection,
+                    args=(conn, addr),
+                    daemon=True
+                )
+                handler_thread.start()
+            except Exception as e:
+                if self.running:
+                    logger.error("Listen error: %s", e)
+                time.sleep(0.5)
+    
+    def _handle_connection(self, conn, addr):
+        """
+        Handle a single connection from UE4.
+        
+        Messages carrying a request_id are pipelined: they run concurrently and
+        each response is sent, tagged with its id, as soon as it is ready.
+        Untagged messages are answered in order, one at a time.
+        """
+        connection = BridgeConnection(addr)
+        chunk = bytearray(self.RECV_BUFFER_SIZE)
+        view = memoryview(chunk)
+        send_lock = threading.Lock()
+        in_flight = threading.BoundedSemaphore(self.max_pipelined)
+        push_ready = threading.Event()
+        subscriber = None
+        writer = None
+        broken = False  # Once a write fails, queued responses are dropped instead of retried
+        
+        def send(message: Dict, response: Dict):
+            # Encode under the lock so a handshake can't switch framing mid-write
+            with send_lock:
+                conn.sendall(self._encode(connection, message, response))
+        
+        def push_loop():
+            # While a write blocks on a slow client, newer pushes coalesce in the subscriber
+            try:
+                while not subscriber.closed:
+                    push_ready.wait(0.5)
+                    push_ready.clear()
+                    pushes = subscriber.take()
+                    while pushes:
+                        for push in pushes:
+                            send(self._PUSH, push)
+                        pushes = subscriber.take()
+            except OSError:
+                pass  # The connection loop reports and cleans up
+        
+        def respond_tagged(message: Dict, future: Future):
+            nonlocal broken
+            try:
+                if not broken:
+                    send(message, self._tagged_response(message, future))
+            except OSError as e:
+                broken = True
+                self.metrics.error('connection')
+                logger.error("Connection error: %s", e)
+            finally:
+                in_flight.release()
+        
+        try:
+            while self.running:
+                received = conn.recv_into(chunk)
+                if not received:
+                    break
+                
+                messages = self._decode(connection, view[:received])
+                while messages:
+                    for message in messages:
+                        if self.log_sampler.sample(message.get('command')):
+                            logger.info("Received from %s: %s", addr, message.get('command', '?'))
+                        
+                        # Process and respond
+                        if connection.is_handshake(message):
+                            with send_lock:
+                                conn.sendall(connection.negotiate(message))
+                        elif self._is_subscription(message):
+                            if subscriber is None:
+                                subscriber = Subscriber(push_ready.set)
+                                threading.Thread(target=push_loop, daemon=True, name=f'ue_bridge_push_{addr}').start()
+                            send(message, self._handle_subscription(subscriber, message))
+                        elif 'request_id' in message:
+                            in_flight.acquire()
+                            if writer is None:
+                                writer = _ResponseWriter(respond_tagged, f'ue_bridge_writer_{addr}')
+                            writer.when_done(message, self.dispatch(message))
+                        else:
+                            send(message, self.dispatch(message).result())
+                    messages = self._decode(connection)
+            
+            # Let pipelined requests finish before the socket goes away
+            for _ in range(self.max_pipelined):
+                in_flight.acquire()
+        
+        except Exception as e:
+            self.metrics.error('protocol' if isinstance(e, BridgeProtocolError) else 'connection')
+            logger.error("Connection error: %s", e)
+        finally:
+            if subscriber is not None:
+                self.subscriptions.remove(subscriber)
+                push_ready.set()
+            if writer is not None:
+                broken = True
+                writer.close()
+            conn.close()
+            self._connection_closed()
+    
+    async def _handle_async_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle a single connection from UE4 on the event loop."""
+        addr = writer.get_extra_info('peername')
+        logger.info("Connected from %s", addr)
+        
+        if not self._connection_opened():
+            logger.warning("Rejected connection from %s: too many connections", addr)
+            writer.write(encode_frame({'status': 'overloaded'}))
+            writer.close()
+            return
+        
+        connection = BridgeConnection(addr)
+        in_flight = asyncio.Semaphore(self.max_pipelined)
+        pipelined = set()
+        loop = asyncio.get_running_loop()
+        subscriber = None
+        
+        async def push():
+            # Waiting in drain() on a slow client lets newer pushes coalesce in the subscriber
+            try:
+                pushes = subscriber.take()
+                while pushes and not writer.is_closing():
+                    for update in pushes:
+                        writer.write(self._encode(connection, self._PUSH, update))
+                    await writer.drain()
+                    pushes = subscriber.take()
+            except OSError:
+                pass
+        
+        def start_push():
+            task = asyncio.ensure_future(push())
+            pipelined.add(task)
+            task.add_done_callback(pipelined.discard)
+        
+        def wake():
+            loop.call_soon_threadsafe(start_push)
+        
+        async def respond_tagged(message: Dict, future: Future):
+            try:
+                await asyncio.wait([asyncio.wrap_future(future)])
+                response = self._tagged_response(message, future)
+                if not writer.is_closing():
+                    writer.write(self._encode(connection, message, response))
+                    await writer.drain()
+            except OSError as e:
+                self.metrics.error('connection')
+                logger.error("Connection error: %s", e)
+            finally:
+                in_flight.release()
+        
+        try:
+            while self.running:
+                data = await reader.read(self.RECV_BUFFER_SIZE)
+                if not data:
+                    break
+                
+                messages = self._decode(connection, data)
+                while messages:
+                    for message in messages:
+                        if self.log_sampler.sample(message.get('command')):
+                            logger.info("Received from %s: %s", addr, message.get('command', '?'))
+                        
+                        if ('request_id' in message and not connection.is_handshake(message)
+                                and not self._is_subscription(message)):
+                            await in_flight.acquire()
+                            # Dispatch now, in arrival order; only the wait for the answer is deferred
+                            task = asyncio.ensure_future(respond_tagged(message, self.dispatch(message)))
+                            pipelined.add(task)
+                            task.add_done_callback(pipelined.discard)
+                            continue
+                        
+                        if connection.is_handshake(message):
+                            writer.write(connection.negotiate(message))
+                        elif self._is_subscription(message):
+                            if subscriber is None:
+                                subscriber = Subscriber(wake)
+                            writer.write(self._encode(connection, message, self._handle_subscription(subscriber, message)))
+                        else:
+                            # Handlers may block on consciousness calls, keep them off the loop
+                            response = await asyncio.wrap_future(self.dispatch(message))
+                            writer.write(self._encode(connection, message, response))
+                        await writer.drain()
+                    messages = self._decode(connection)
+            
+            # Let pipelined requests finish before the socket goes away
+            if pipelined:
+                await asyncio.gather(*pipelined, return_exceptions=True)
+        
+        except asyncio.CancelledError:
+            pass  # Server shutting down
+        except Exception as e:
+            self.metrics.error('protocol' if isinstance(e, BridgeProtocolError) else 'connection')
+            logger.error("Connection error: %s", e)
+        finally:
+            if subscriber is not None:
+                self.subscriptions.remove(subscriber)
+            for task in pipelined:
+                task.cancel()
+            writer.close()
+            self._connection_closed()
+    
+    def _decode(self, connection: BridgeConnection, data=None) -> List[Dict]:
+        """Feed received bytes (or drain what is buffered) and time the decode."""
+        start = time.perf_counter()
+        if data is None:
+            messages = connection.pending()
+        else:
+            self.metrics.received(len(data))
+            messages = connection.feed(data)
+        if messages:
+            self.metrics.observe_decode(messages, time.perf_counter() - start)
+        return messages
+    
+    def _encode(self, connection: BridgeConnection, message: Dict, response: Dict) -> bytes:
+        start = time.perf_counter()
+        data = connection.encode(response)
+        self.metrics.observe('encode', message.get('command'), time.perf_counter() - start)
+        self.metrics.sent(len(data))
+        return data
+    
+    def start_datagram_server(self, host: str = 'localhost', port: int = 6971, commands=None,
+                              codec: str = 'json') -> int:
+        """
+        Accept loss-tolerant, high-frequency updates over UDP next to the TCP server.
+        
+        Only `commands` (default DATAGRAM_COMMANDS) are accepted; everything
+        that needs a reply or ordering stays on TCP. Packets carry a seq and
+        go through datagram_gate: stale ones are dropped and updates for a
+        busy (command, agent, input_type) coalesce to the latest. Nothing is sent back.
+        Returns the bound port.
+        """
+        codecs = available_codecs()
+        if codec not in codecs:
+            raise BridgeProtocolError(f"Unsupported codec: {codec}")
+        
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+        sock.bind((host, port))
+        sock.settimeout(0.2)
+        self._datagram_socket = sock
+        self._datagram_thread = threading.Thread(
+            target=self._datagram_loop, args=(sock, codecs[codec], frozenset(commands or self.DATAGRAM_COMMANDS)),
+            daemon=True, name='ue_bridge_datagram')
+        self._datagram_thread.start()
+        
+        port = sock.getsockname()[1]
+        logger.info("UE Bridge (datagram) listening on %s:%s", host, port)
+        return port
+    
+    def _datagram_loop(self, sock: socket.socket, codec: MessageCodec, commands: frozenset):
+        while self._datagram_socket is sock:
+            try:
+                payload, addr = sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Closed by stop()
+            
+            try:
+                start = time.perf_counter()
+                message = codec.decode(payload)
+                self.metrics.received(len(payload))
+                if message.get('command') not in commands:
+                    self.metrics.error('datagram_rejected')
+                    continue
+                self.metrics.observe_decode([message], time.perf_counter() - start)
+                self.datagram_gate.offer(addr, message)
+            except Exception as e:
+                self.metrics.error('protocol')
+                logger.error("Bad datagram from %s: %s", addr, e)
+    
+    def start_shared_memory_server(self, name: str = None, size: int = 4 * 1024 * 1024,
+                                   codec: str = 'json') -> str:
+        """
+        Serve one co-located client over a shared memory ring pair instead of TCP.
+        
+        Returns the segment name for the client (see SharedMemoryClient). Messages
+        get the same handling as on a socket: untagged requests are answered in
+        order, ones with a request_id as they complete. Call again for more clients.
+        """
+        codecs = available_codecs()
+        if codec not in codecs:
+            raise BridgeProtocolError(f"Unsupported codec: {codec}")
+        channel = SharedMemoryChannel.create(name, size, codecs[codec])
+        thread = threading.Thread(target=self._serve_shared_memory, args=(channel,), daemon=True,
+                                  name=f'ue_bridge_shm_{channel.name}')
+        self._shm_stop.clear()
+        self._shm_channels.append(channel)
+        self._shm_threads.append(thread)
+        thread.start()
+        logger.info("UE Bridge (shared memory) serving on %s", channel.name)
+        return channel.name
+    
+    def _serve_shared_memory(self, channel: SharedMemoryChannel):
+        def send(message: Dict, response: Dict):
+            start = time.perf_counter()
+            payload = channel.codec.encode(response)
+            self.metrics.observe('encode', message.get('command'), time.perf_counter() - start)
+            if channel.send_bytes(payload):
+                self.metrics.sent(len(payload))
+            elif not self._shm_stop.is_set():
+                self.metrics.error('shm_full')
+                logger.error("Dropped response to %s: shared memory channel full", message.get('command', '?'))
+        
+        def respond_tagged(message: Dict, future: Future):
+            send(message, self._tagged_response(message, future))
+        
+        # send() can wait on a full ring, so it must not run in the future's callbacks
+        writer = _ResponseWriter(respond_tagged, f'ue_bridge_shm_writer_{channel.name}')
+        while not self._shm_stop.is_set():
+            try:
+                payload = channel.receive_bytes(timeout=0.1)
+                if payload is None:
+                    continue
+                start = time.perf_counter()
+                message = channel.codec.decode(payload)
+                self.metrics.received(len(payload))
+                self.metrics.observe_decode([message], time.perf_counter() - start)
+                
+                command = message.get('command')
+                if self.log_sampler.sample(command):
+                    logger.info("Received from %s: %s", channel.name, command or '?')
+                
+                if 'request_id' in message:
+                    writer.when_done(message, self.dispatch(message))
+                elif self._deadline_ms(message) is None:
+                    # We block on the answer anyway, so skip the worker handoff when the agent is idle
+                    send(message, self.workers.run_inline(self.dispatch, message).result())
+                else:
+                    send(message, self.dispatch(message).result())
+            except Exception as e:
+                self.metrics.error('protocol' if isinstance(e, BridgeProtocolError) else 'connection')
+                logger.error("Shared memory channel error: %s", e)
+        writer.close()
+    
+    def _connection_opened(self) -> bool:
+        """Count a new connection, unless that would exceed the admission limit."""
+        with self._connections_lock:
+            if not self.admission.admit_connection(self.active_connections):
+                return False
+            self.active_connections += 1
+            return True
+    
+    def _connection_closed(self):
+        with self._connections_lock:
+            self.active_connections -= 1
+    
+    def dispatch(self, message: Dict) -> Future:
+        """
+        Run process_message() for a message on the worker pool.
+        Messages for the same agent_name complete in the order they were dispatched.
+        
+        If the message has a deadline (its deadline_ms or the command's default),
+        the returned future resolves to a fallback response when it passes.
+        """
+        start = time.perf_counter()
+        seq = self.recorder.record_in(message) if self.recorder is not None else None
+        future = self._dispatch(message)
+        command = message.get('command')
+        future.add_done_callback(
+            lambda f: self.metrics.observe('handler', command, time.perf_counter() - start))
+        
+        if command == GameCommand.DECISION_REQUEST.value:
+            future.add_done_callback(lambda f: self._remember_decision(message, f))
+        
+        deadline_ms = self._deadline_ms(message)
+        if deadline_ms is not None and not future.done():
+            response = Future()
+            future.add_done_callback(lambda f: _forward(f, response))
+            
+            def on_deadline():
+                if _settle(response, self._fallback_response(message, 'timeout')):
+                    with self._timeouts_lock:
+                        self.timeouts[command] = self.timeouts.get(command, 0) + 1
+            
+            self._deadlines.schedule(time.monotonic() + deadline_ms / 1000.0, on_deadline)
+            future = response
+        
+        if seq is not None:
+            future.add_done_callback(lambda f: self._record_response(seq, f, start))
+        return future
+    
+    def _record_response(self, seq: int, future: Future, start: float):
+        if future.exception() is not None:
+            response = {'status': 'error', 'reason': str(future.exception())}
+        else:
+            response = future.result()
+        self.recorder.record_out(seq, response, time.perf_counter() - start)
+    
+    def _deadline_ms(self, message: Dict) -> Optional[float]:
+        deadline_ms = message.get('deadline_ms')
+        if deadline_ms is None:
+            deadline_ms = self.command_deadlines.get(message.get('command'))
+        return deadline_ms
+    
+    def _remember_decision(self, message: Dict, future: Future):
+        """Keep the latest real decision per agent as a fallback for timeouts, and push it to subscribers."""
+        if future.exception() is not None:
+            return
+        response = future.result()
+        if response.get('status') in ('overloaded', 'timeout'):
+            return
+        agent_name = message.get('agent_name')
+        self.last_decisions[agent_name] = response
+        
+        self.publish(AIResponse.CHARACTER_ACTION.value, agent_name, response)
+        emotion = response.get('emotion')
+        if emotion is not None and self._last_emotions.get(agent_name) != emotion:
+            self._last_emotions[agent_name] = emotion
+            self.publish(AIResponse.EMOTION_STATE.value, agent_name, {'emotion': emotion})
+    
+    def publish(self, topic: str, agent_name: str, data: Dict) -> int:
+        """
+        Push an update (character_action, emotion_state, trait_update) to every
+        connection subscribed to it; returns how many. The consciousness system
+        can call this directly, e.g. for trait changes.
+        """
+        if not self.subscriptions.has_subscribers(topic, agent_name):
+            return 0
+        return self.subscriptions.publish(topic, agent_name, data)
+    
+    @staticmethod
+    def _is_subscription(message: Dict) -> bool:
+        return message.get('command') in (GameCommand.SUBSCRIBE.value, GameCommand.UNSUBSCRIBE.value)
+    
+    def _handle_subscription(self, subscriber: Subscriber, message: Dict) -> Dict:
+        """subscribe/unsubscribe for one connection; agent_name "*" means every agent."""
+        topics = message.get('topics')
+        try:
+            if message.get('command') == GameCommand.SUBSCRIBE.value:
+                agent_name = message.get('agent_name', '*')
+                subscribed = self.subscriptions.subscribe(subscriber, agent_name, topics or SubscriptionHub.TOPICS)
+                response = {'status': 'ok', 'agent_name': agent_name, 'topics': subscribed}
+            else:
+                self.subscriptions.unsubscribe(subscriber, message.get('agent_name'), topics)
+                response = {'status': 'ok'}
+        except ValueError as e:
+            response = {'status': 'error', 'reason': str(e)}
         
-        logger.info(f"UnrealBridge initialized for project: {self.ue_project_path}")
+        if 'request_id' in message:
+            response['request_id'] = message['request_id']
+        return response
     
-    def _find_ue_project(self) -> str:
-        """Auto-detect Unreal project in workspace."""
-        # Check common locations
-        possible_paths = [
-            r"c:\Users\Busin\OneDrive\Aura_Prime\GameProject",
-            r"c:\Users\Busin\OneDrive\Aura_Prime\VIBE_MIRACLE\game",
-            r"c:\Users\Busin\OneDrive\Aura_Prime\MyGameProject"
-        ]
+    def _dispatch(self, message: Dict) -> Future:
+        agent_name = message.get('agent_name')
+        command = message.get('command')
         
-        for path in possible_paths:
-            if os.path.exists(path):
-                if any(f.endswith('.uproject') for f in os.listdir(path)):
-                    return path
+        key = self._coalesce_key(message)
+        if key is not None:
+            return self.single_flight.join(key, lambda: self._submit(message), group=agent_name)
         
-        logger.warning("Could not auto-detect UE project, using default")
-        return r"c:\Users\Busin\OneDrive\Aura_Prime\GameProject"
+        # Inputs are acknowledged right away and applied when their window flushes.
+        # Admission happens here: once UE is told an input was processed it must not be shed.
+        if (command == GameCommand.INPUT_RECEIVED.value and self.input_aggregator is not None
+                and command not in self.request_handlers):
+            if not self.admission.admit(command, self.workers.pending):
+                return self._shed(message)
+            self.input_aggregator.add(message)
+            ack = Future()
+            ack.set_result({'processed': True, 'aggregated': True})
+            return ack
+        
+        # Anything else may change the agent, so later duplicates must not
+        # reuse results that were computed (or queued) before it
+        self.single_flight.forget(agent_name)
+        return self._submit(message)
     
-    def connect_consciousness(self, consciousness_system):
-        """Link to VIBE MIRACLE consciousness system."""
-        self.consciousness_bridge = consciousness_system
-        logger.info("Connected to consciousness system (VIBE MIRACLE)")
+    def _apply_aggregated_input(self, message: Dict) -> Future:
+        # Every input merged into this one was admitted (and acknowledged) in _dispatch
+        self.single_flight.forget(message.get('agent_name'))
+        return self._submit(message, admitted=True)
     
-    def register_handler(self, command_type: str, handler: Callable):
-        """Register a handler for a specific command type."""
-        self.request_handlers[command_type] = handler
-        logger.info(f"Registered handler for: {command_type}")
+    def _shed(self, message: Dict) -> Future:
+        shed = Future()
+        shed.set_result(self._fallback_response(message, 'overloaded'))
+        return shed
     
-    def start_server(self, host: str = 'localhost'):
-        """Start listening for messages from UE4."""
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.socket.bind((host, self.port))
-        self.socket.listen(1)
-        self.running = True
+    def _submit(self, message: Dict, admitted: bool = False) -> Future:
+        """Admit a message and queue it on the worker pool, or answer it with a shed response."""
+        agent_name = message.get('agent_name')
+        command = message.get('command')
+        # World state is kept on this bridge (handlers read bridge.world_state), so it is never shipped out
+        remote = (self.workers.backend == 'process' and command not in self.request_handlers
+                  and command != GameCommand.GAME_STATE_UPDATE.value)
         
-        logger.info(f"UE Bridge listening on {host}:{self.port}")
+        if not admitted and not self.admission.admit(command, self.workers.pending):
+            return self._shed(message)
         
-        # Start listener in background thread
-        listener_thread = threading.Thread(target=self._listen, daemon=True)
-        listener_thread.start()
+        # Under overload, work still queued past its deadline is dropped instead of run late.
+        # Coalesced requests share this work, so for them only each caller's
+        # dispatch() deadline applies; a joiner without one waits for the result.
+        deadline = None
+        deadline_ms = self._deadline_ms(message)
+        if deadline_ms is not None and self._coalesce_key(message) is None:
+            deadline = time.monotonic() + deadline_ms / 1000.0
+        expired = lambda: self._fallback_response(message, 'timeout')
+        
+        # Decisions queued for the same agent are answered together when batching is on
+        if (command == GameCommand.DECISION_REQUEST.value and self.workers.max_batch > 1
+                and command not in self.request_handlers):
+            batch_fn = _process_decision_batch_in_worker if remote else self._handle_decision_batch
+            return self.workers.submit_batched(agent_name, batch_fn, message, local=not remote,
+                                               deadline=deadline, expired=expired)
+        
+        # Registered handlers live in this process, so they always run on threads
+        fn = _process_in_worker if remote else self.process_message
+        return self.workers.submit(agent_name, fn, message, local=not remote,
+                                   deadline=deadline, expired=expired)
     
-    def _listen(self):
-        """Listen for incoming messages from UE4."""
-        while self.running:
-            try:
-                conn, addr = self.socket.accept()
-                logger.info(f"Connected from {addr}")
-                
-                # Handle this connection
-                handler_thread = threading.Thread(
-                    target=self._handle_connection,
-                    args=(conn, addr),
-                    daemon=True
-                )
-                handler_thread.start()
-            except Exception as e:
-                if self.running:
-                    logger.error(f"Listen error: {e}")
-                time.sleep(0.5)
+    def _fallback_response(self, message: Dict, status: str) -> Dict:
+        """
+        Fast answer for work the bridge won't wait for (shed or timed out):
+        a cached or last known decision, a default action, or just the status.
+        """
+        command = message.get('command')
+        
+        if command == GameCommand.DECISION_REQUEST.value:
+            agent_name = message.get('agent_name')
+            if self.decision_cache is not None:
+                cached = self.decision_cache.get(self.decision_cache.key_for(
+                    agent_name, message.get('options', []), message.get('context', {})))
+                if cached is not None:
+                    return dict(cached, status=status)
+            last = self.last_decisions.get(agent_name)
+            if last is not None:
+                return dict(last, status=status, stale=True)
+            return {'action': 'wait', 'parameters': {}, 'reasoning': f'Bridge {status}', 'status': status}
+        if command == GameCommand.INPUT_RECEIVED.value:
+            return {'processed': False, 'status': status}
+        return {'status': status}
     
-    def _handle_connection(self, conn, addr):
-        """Handle a single connection from UE4."""
+    def _coalesce_key(self, message: Dict) -> Optional[str]:
+        """Identity of a request for single-flight purposes; None if it must always run."""
+        command = message.get('command')
+        if command in self.request_handlers:
+            return None
+        if command == GameCommand.DECISION_REQUEST.value:
+            return canonical_hash(command, message.get('agent_name'),
+                                  message.get('options', []), message.get('context', {}))
+        if command == GameCommand.DIALOGUE_REQUEST.value:
+            return canonical_hash(command, message.get('agent_name'), message.get('context', {}))
+        return None
+    
+    def _tagged_response(self, message: Dict, future: Future) -> Dict:
+        """Response for a pipelined request; failures become error responses instead of dropping the connection."""
+        request_id = message.get('request_id')
         try:
-            while self.running:
-                data = conn.recv(4096)
-                if not data:
-                    break
-                
-                # Parse message
-                message = json.loads(data.decode())
-                logger.info(f"Received from {addr}: {message.get('command', '?')}")
-                
-                # Process and respond
-                response = self.process_message(message)
-                conn.sendall(json.dumps(response).encode())
-        
+            response = future.result()
         except Exception as e:
-            logger.error(f"Connection error: {e}")
-        finally:
-            conn.close()
+            self.metrics.error('handler')
+            logger.error("Request %s failed: %s", request_id, e)
+            response = {'status': 'error', 'reason': str(e)}
+        
+        # Copy rather than mutate: handlers may hand back shared dicts
+        return dict(response, request_id=request_id)
     
     def process_message(self, message: Dict) -> Dict:
         """
@@ -190,13 +2956,19 @@ class UnrealBridge:
         
         # Default handlers
         if command == GameCommand.DECISION_REQUEST.value:
-            return self._handle_decision_request(message)
+            return self._direct_flight.do(self._coalesce_key(message),
+                                          lambda: self._handle_decision_request(message),
+                                          group=message.get('agent_name'))
         elif command == GameCommand.DIALOGUE_REQUEST.value:
-            return self._handle_dialogue_request(message)
+            return self._direct_flight.do(self._coalesce_key(message),
+                                          lambda: self._handle_dialogue_request(message),
+                                          group=message.get('agent_name'))
         elif command == GameCommand.INPUT_RECEIVED.value:
             return self._handle_input(message)
+        elif command == GameCommand.GAME_STATE_UPDATE.value:
+            return self._handle_game_state_update(message)
         else:
-            logger.warning(f"Unknown command: {command}")
+            logger.warning("Unknown command: %s", command)
             return {'status': 'unknown_command'}
     
     def _handle_decision_request(self, message: Dict) -> Dict:
@@ -212,17 +2984,74 @@ class UnrealBridge:
             logger.warning("No consciousness bridge connected")
             return {'action': 'wait', 'reasoning': 'No consciousness available'}
         
+        cache = self.decision_cache
+        if cache is not None:
+            cache_key = cache.key_for(agent_name, options, context)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation(agent_name)
+        
         # Get consciousness instance
         consciousness = self.consciousness_bridge.get_consciousness(agent_name)
         if not consciousness:
-            logger.warning(f"No consciousness for {agent_name}")
+            logger.warning("No consciousness for %s", agent_name)
             return {'action': 'wait', 'reasoning': f'No consciousness for {agent_name}'}
         
         # Make decision
         decision = consciousness.make_decision(options, context, {})
         
-        logger.info(f"Decision for {agent_name}: {decision.get('action', 'wait')}")
+        if self.log_sampler.sample(GameCommand.DECISION_REQUEST.value):
+            logger.info("Decision for %s: %s", agent_name, decision.get('action', 'wait'))
+        
+        response = self._decision_response(consciousness, decision)
+        if cache is not None:
+            cache.put(agent_name, cache_key, response, generation)
+        return response
+    
+    def _handle_decision_batch(self, messages: List[Dict]) -> List[Dict]:
+        """
+        Answer several DECISION_REQUESTs for one agent with a single consciousness
+        lookup. Uses consciousness.make_decisions(requests) when the agent offers a
+        batched API, otherwise loops over make_decision.
+        """
+        agent_name = messages[0].get('agent_name')
+        consciousness = None
+        if self.consciousness_bridge and len(messages) > 1:
+            consciousness = self.consciousness_bridge.get_consciousness(agent_name)
+        if not consciousness:
+            # Nothing to amortise; the single-request path builds the fallbacks
+            return [self._handle_decision_request(message) for message in messages]
+        
+        requests = [(m.get('options', []), m.get('context', {}), {}) for m in messages]
+        responses: List[Optional[Dict]] = [None] * len(messages)
+        
+        cache = self.decision_cache
+        if cache is not None:
+            generation = cache.generation(agent_name)
+            keys = [cache.key_for(agent_name, options, context) for options, context, _ in requests]
+            responses = [cache.get(key) for key in keys]
+        misses = [i for i, response in enumerate(responses) if response is None]
+        if not misses:
+            return responses
+        
+        make_decisions = getattr(consciousness, 'make_decisions', None)
+        if callable(make_decisions):
+            decisions = make_decisions([requests[i] for i in misses])
+        else:
+            decisions = [consciousness.make_decision(*requests[i]) for i in misses]
+        
+        if self.log_sampler.sample(GameCommand.DECISION_REQUEST.value):
+            logger.info("Batched %s decisions for %s", len(misses), agent_name)
         
+        for i, decision in zip(misses, decisions):
+            responses[i] = self._decision_response(consciousness, decision)
+            if cache is not None:
+                cache.put(agent_name, keys[i], responses[i], generation)
+        return responses
+    
+    @staticmethod
+    def _decision_response(consciousness, decision: Dict) -> Dict:
         return {
             'action': decision.get('action', 'wait'),
             'parameters': decision.get('parameters', {}),
@@ -247,7 +3076,8 @@ class UnrealBridge:
         # Generate dialogue (this would use the agent's specific dialogue system)
         dialogue = consciousness.generate_dialogue(context)
         
-        logger.info(f"Dialogue for {agent_name}: {dialogue[:50]}...")
+        if self.log_sampler.sample(GameCommand.DIALOGUE_REQUEST.value):
+            logger.info("Dialogue for %s: %s...", agent_name, dialogue[:50])
         
         return {
             'dialogue': dialogue,
@@ -269,68 +3099,519 @@ class UnrealBridge:
         if not consciousness:
             return {'processed': False}
         
-        # Record input as experience
-        consciousness.learn_from_consequence({
+        # Record input as experience (merged inputs carry their own count and magnitude)
+        experience = {
             'type': 'player_input',
             'input': input_type,
             'outcome': 'neutral',
-            'magnitude': 0.5
-        })
+            'magnitude': message.get('magnitude', 0.5)
+        }
+        if 'count' in message:
+            experience['count'] = message['count']
+        consciousness.learn_from_consequence(experience)
         
-        logger.info(f"Recorded input for {agent_name}: {input_type}")
+        # The agent has changed, so its cached and in-flight decisions are stale
+        self._direct_flight.forget(agent_name)
+        if self.decision_cache is not None:
+            self.decision_cache.invalidate(agent_name)
+        
+        if self.log_sampler.sample(GameCommand.INPUT_RECEIVED.value):
+            logger.info("Recorded input for %s: %s", agent_name, input_type)
         
         return {'processed': True}
     
+    def _handle_game_state_update(self, message: Dict) -> Dict:
+        """
+        UE4 is telling us: "Here's what changed in the world"
+        → Apply the delta to the agent's world state (handlers read it via world_state.snapshot)
+        """
+        response = self.world_state.apply(message)
+        
+        if response['status'] == 'resync':
+            logger.warning("World state gap for %s: have %s, got delta from %s",
+                           message.get('agent_name'), response['version'], message.get('base_version'))
+        
+        return response
+    
     def send_to_ue(self, message: Dict, host: str = 'localhost', port: int = 6970):
         """
         Send a message to Unreal Engine editor.
         (For pushing code changes, state updates, etc)
+        
+        Goes through a persistent, pooled channel per (host, port), so this only
+        queues the message; see outbound_stats() for delivery and drops.
         """
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((host, port))
-            sock.sendall(json.dumps(message).encode())
-            sock.close()
-            logger.info(f"Sent to UE: {message.get('command', '?')}")
-        except Exception as e:
-            logger.error(f"Failed to send to UE: {e}")
+        if self._outbound_channel(host, port).send(message):
+            if self.log_sampler.sample('send_to_ue'):
+                logger.info("Sent to UE: %s", message.get('command', '?'))
+        else:
+            logger.error("Failed to send to UE: outbound channel closed")
+    
+    def send_many_to_ue(self, messages: List[Dict], host: str = 'localhost', port: int = 6970) -> int:
+        """Queue several messages for the editor in one go; returns how many were accepted."""
+        accepted = self._outbound_channel(host, port).send_many(messages)
+        if self.log_sampler.sample('send_to_ue'):
+            logger.info("Sent %s messages to UE", accepted)
+        return accepted
+    
+    def send_datagram_to_ue(self, message: Dict, host: str = 'localhost', port: int = 6972) -> bool:
+        """
+        Push loss-tolerant state (emotion_state, trait_update, ...) to the editor
+        over UDP, so it never queues behind or in front of reliable TCP traffic.
+        """
+        with self._outbound_lock:
+            sender = self._datagram_senders.get((host, port))
+            if sender is None:
+                sender = self._datagram_senders[(host, port)] = DatagramSender(host, port)
+        return sender.send(message)
+    
+    def _outbound_channel(self, host: str, port: int) -> OutboundChannel:
+        with self._outbound_lock:
+            channel = self._outbound.get((host, port))
+            if channel is None:
+                channel = OutboundChannel(host, port, **self.outbound_options)
+                self._outbound[(host, port)] = channel
+            return channel
+    
+    def outbound_stats(self) -> Dict[str, Dict]:
+        """Pool and queue metrics for every outbound channel, keyed by host:port."""
+        with self._outbound_lock:
+            channels = list(self._outbound.items())
+        return {f"{host}:{port}": channel.stats() for (host, port), channel in channels}
+    
+    def get_metrics(self) -> str:
+        """Bridge metrics in Prometheus text format."""
+        # Other threads keep adding keys to these, so only iterate snapshots
+        admission = self.admission.stats()
+        with self._timeouts_lock:
+            timeouts = dict(self.timeouts)
+        subscriptions = self.subscriptions.stats()
+        
+        gauges = {
+            'ue_bridge_active_connections': self.active_connections,
+            'ue_bridge_queue_depth': self.workers.pending,
+            'ue_bridge_overloaded': int(admission['overloaded']),
+            'ue_bridge_subscription_subscribers': subscriptions['subscribers'],
+            # Summed over current subscribers, so these drop when one leaves
+            'ue_bridge_subscription_pushed': subscriptions['pushed'],
+            'ue_bridge_subscription_coalesced': subscriptions['coalesced'],
+        }
+        counters = {
+            'ue_bridge_coalesced_total': self.single_flight.coalesced,
+            'ue_bridge_subscription_published_total': subscriptions['published'],
+        }
+        for command, count in admission['shed'].items():
+            counters[f'ue_bridge_shed_total{{command="{command}"}}'] = count
+        for command, count in timeouts.items():
+            counters[f'ue_bridge_timeouts_total{{command="{command}"}}'] = count
+        if self.decision_cache is not None:
+            stats = self.decision_cache.stats()
+            counters['ue_bridge_decision_cache_hits_total'] = stats['hits']
+            counters['ue_bridge_decision_cache_misses_total'] = stats['misses']
+            gauges['ue_bridge_decision_cache_entries'] = stats['entries']
+        for name, value in self.datagram_gate.stats().items():
+            counters[f'ue_bridge_datagram_total{{result="{name}"}}'] = value
+        for command, count in self.log_sampler.stats()['suppressed'].items():
+            counters[f'ue_bridge_log_suppressed_total{{command="{command}"}}'] = count
+        for target, stats in self.outbound_stats().items():
+            gauges[f'ue_bridge_outbound_queue_depth{{target="{target}"}}'] = stats['queue_depth']
+            counters[f'ue_bridge_outbound_dropped_total{{target="{target}"}}'] = stats['dropped']
+        return self.metrics.render(gauges, counters)
+    
+    def start_metrics_server(self, host: str = 'localhost', port: int = 9469):
+        """Serve get_metrics() at http://host:port/metrics for Prometheus to scrape."""
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        server.daemon_threads = True
+        server.bridge = self
+        self._metrics_server = server
+        threading.Thread(target=server.serve_forever, daemon=True, name='ue_bridge_metrics').start()
+        logger.info("Metrics available at http://%s:%s/metrics", host, server.server_address[1])
     
     def stop(self):
         """Shutdown the bridge."""
+        # Buffered inputs were already acknowledged, so they must still be applied
+        if self.input_aggregator is not None:
+            wait_futures(self.input_aggregator.stop(), timeout=5)
+        
         self.running = False
         if self.socket:
             self.socket.close()
+        with self._outbound_lock:
+            channels, self._outbound = list(self._outbound.values()), {}
+            senders, self._datagram_senders = list(self._datagram_senders.values()), {}
+        for channel in channels:
+            channel.close()
+        for sender in senders:
+            sender.close()
+        datagram_socket, self._datagram_socket = self._datagram_socket, None
+        if datagram_socket is not None:
+            datagram_socket.close()
+            self._datagram_thread.join(timeout=5)
+        self._shm_stop.set()
+        for thread in self._shm_threads:
+            thread.join(timeout=5)
+        for channel in self._shm_channels:
+            channel.close()
+        self._shm_channels, self._shm_threads = [], []
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+        if self._server_thread is not None:
+            self._server_thread.join(timeout=5)
+            self._server_thread = None
+        if self.recorder is not None:
+            self.recorder.flush()
+        if self._metrics_server is not None:
+            self._metrics_server.shutdown()
+            self._metrics_server.server_close()
+            self._metrics_server = None
+        self.workers.shutdown(wait=False)
         logger.info("Bridge stopped")
 
 
+class IncrementalJsonObject:
+    """
+    Parses a JSON object that arrives in pieces (e.g. streamed tokens) and
+    reports each top-level member as soon as its value is complete.
+    
+    Anything before the opening brace, such as a ```json fence or a sentence
+    of preamble, is skipped, as is anything after the closing brace. Each new
+    character is scanned once; only finished values go through json.loads.
+    """
+    
+    def __init__(self):
+        self.done = False
+        self._buf = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = 'key'
+        self._start = None
+        self._key = None
+        self._members: Dict = {}
+    
+    def feed(self, chunk: str) -> List[tuple]:
+        """Add text; returns the (key, value) members completed by it."""
+        self._buf += chunk
+        completed = []
+        buf = self._buf
+        
+        while self._pos < len(buf) and not self.done:
+            pos = self._pos
+            c = buf[pos]
+            self._pos += 1
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == 'key':
+                            self._key = json.loads(buf[self._start:pos + 1], strict=False)
+                            self._expect = 'colon'
+                        else:
+                            completed.append(self._finish(buf[self._start:pos + 1]))
+                continue
+            
+            if self._depth == 0:
+                if c == '{':
+                    self._depth = 1
+                continue
+            
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._start = pos
+            elif c in '{[':
+                if self._depth == 1:
+                    self._start = pos
+                self._depth += 1
+            elif c in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    completed.append(self._finish(buf[self._start:pos + 1]))
+                elif self._depth == 0:
+                    if self._expect == 'value' and self._start is not None:
+                        completed.append(self._finish(buf[self._start:pos]))
+                    self.done = True
+            elif self._depth == 1:
+                if c == ':':
+                    self._expect = 'value'
+                    self._start = None
+                elif c == ',':
+                    if self._expect == 'value' and self._start is not None:
+                        completed.append(self._finish(buf[self._start:pos]))
+                    self._expect = 'key'
+                elif self._expect == 'value' and self._start is None and not c.isspace():
+                    self._start = pos  # A number, true, false or null
+        
+        return completed
+    
+    def _finish(self, text: str) -> tuple:
+        value = json.loads(text, strict=False)
+        self._members[self._key] = value
+        self._expect = 'after'
+        self._start = None
+        return self._key, value
+    
+    def result(self) -> Dict:
+        """The whole object; raises ValueError if it has not been closed yet."""
+        if not self.done:
+            raise ValueError("Streamed JSON object is incomplete")
+        return dict(self._members)
+
+
+_FENCED_BLOCK = re.compile(r"```[\w+-]*[ \t]*\n(.*?)```", re.DOTALL)
+
+
+def extract_json(text: str) -> Dict:
+    """
+    The JSON object in a model reply. Tolerates ```json fences, preamble or
+    chatter around the object and raw newlines inside strings; raises
+    ValueError when there is no object to be found.
+    """
+    for candidate in [text] + _FENCED_BLOCK.findall(text):
+        try:
+            value = json.loads(candidate, strict=False)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    
+    # Unfenced object inside prose: try each opening brace in turn
+    start = text.find('{')
+    while start != -1:
+        parser = IncrementalJsonObject()
+        try:
+            parser.feed(text[start:])
+        except ValueError:
+            parser.done = False
+        if parser.done and parser.result():
+            return parser.result()
+        start = text.find('{', start + 1)
+    raise ValueError("No JSON object in completion")
+
+
+def _write_atomic(path: Path, text: str):
+    """Write via a temporary file and rename, so watchers never see half a file."""
+    temp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    temp.write_text(text)
+    os.replace(temp, path)
+
+
+class GenerationCache:
+    """
+    On-disk, content-addressed cache of parsed LM output (header_file/source_file).
+    
+    Entries are JSON files named by a hash of everything that shapes the
+    completion (prompt, model, sampling params), so a changed prompt is simply
+    a different key. Hits refresh the file's mtime, and once the cache grows
+    past max_bytes the least recently used files are deleted.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._bytes = sum(path.stat().st_size for path in self._entries())
+    
+    @staticmethod
+    def key_for(prompt: str, model: str, params: Dict) -> str:
+        return canonical_hash(prompt, model, params)
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.json'
+    
+    def _entries(self):
+        return self.directory.glob('*/*.json')
+    
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            value = json.loads(path.read_text(encoding='utf-8'))
+            os.utime(path)  # Recency for LRU eviction
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+    
+    def put(self, key: str, value: Dict):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = json.dumps(value, separators=(',', ':')).encode()
+        
+        # Write then rename, so readers never see a partial entry
+        temp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        temp.write_bytes(data)
+        with self._lock:
+            try:
+                self._bytes -= path.stat().st_size
+            except OSError:
+                pass
+            os.replace(temp, path)
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+    
+    def _evict(self):
+        """Delete least recently used entries down to 90% of max_bytes. Lock held."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        
+        self._bytes = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._bytes <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._bytes -= size
+            self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+            self._bytes = 0
+    
+    def stats(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'bytes': self._bytes,
+        }
+
+
+@dataclass
+class GenerationKind:
+    """
+    One kind of code CodeGenerator can produce: prompt(name, **params) builds
+    the request, files maps each required reply field to a filename template
+    ("{name}" is filled in), and validate, if set, raises ValueError for a
+    reply that must not be written.
+    """
+    name: str
+    label: str
+    prompt: Callable[..., str]
+    files: Dict[str, str]
+    validate: Optional[Callable[[Dict], None]] = None
+
+
 class CodeGenerator:
     """
     Generates C++ code for Unreal Engine based on consciousness decisions.
     Integrates with LM Studio for intelligent generation.
+    
+    Requests go through one keep-alive requests.Session with a connection pool
+    sized to max_concurrency, and at most max_concurrency generations are in
+    flight at once, from threads or from agenerate_character_class().
+    
+    With a GenerationCache, parsed output is reused for identical prompts and
+    sampling params unless a call passes bypass_cache=True.
+    
+    Every kind of output goes through one pipeline (see generate()):
+    prompt -> cache -> request -> extract -> validate -> write, with each
+    stage's time recorded per kind in stats(). New kinds are added with
+    register_kind().
     """
     
-    def __init__(self, lm_studio_url: str = "http://localhost:1234"):
+    # generate_batch() spec keys that are not prompt params
+    _SPEC_KEYS = frozenset({'kind', 'name', 'priority', 'bypass_cache'})
+    
+    def __init__(self, lm_studio_url: str = "http://localhost:1234", max_concurrency: int = 4,
+                 timeout: float = 30, connect_timeout: float = 5, cache: GenerationCache = None):
         self.lm_studio_url = lm_studio_url
         self.output_dir = None
+        self.model = "local-model"
+        self.temperature = 0.3
+        self.max_tokens = 2000
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        
+        self._session = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._limit = threading.BoundedSemaphore(max_concurrency)
+        self._async_limits = weakref.WeakKeyDictionary()  # loop -> asyncio.Semaphore
+        self._lock = threading.Lock()
+        self._stage_times: Dict[tuple, Histogram] = {}
+        
+        self.kinds: Dict[str, GenerationKind] = {}
+        self.register_kind(GenerationKind('character', 'character class', self._character_prompt,
+                                          {'header_file': '{name}.h', 'source_file': '{name}.cpp'}))
+        self.register_kind(GenerationKind('game_logic', 'game logic system', self._game_logic_prompt,
+                                          {'header_file': '{name}.h', 'source_file': '{name}.cpp'}))
+    
+    def register_kind(self, kind: GenerationKind):
+        """Make kind available to generate() and generate_batch() specs."""
+        self.kinds[kind.name] = kind
     
     def set_output_dir(self, path: str):
         """Set where to save generated code."""
         self.output_dir = Path(path)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
-    def generate_character_class(self, character_name: str, traits: Dict) -> Dict:
-        """
-        Generate a complete UE4 character class with consciousness integration.
-        """
-        
-        # Build prompt for LM Studio
-        prompt = f"""
+    def _http(self):
+        """The shared keep-alive session, created on first use."""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency, pool_block=True)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+    
+    def _complete(self, prompt: str) -> str:
+        """One chat completion against LM Studio; returns the message content."""
+        with self._limit:
+            response = self._http().post(
+                f"{self.lm_studio_url}/v1/chat/completions",
+                json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": self.temperature,
+                    "max_tokens": self.max_tokens
+                },
+                timeout=(self.connect_timeout, self.timeout)
+            )
+            response.raise_for_status()
+            result = response.json()
+        return result['choices'][0]['message']['content']
+    
+    @staticmethod
+    def _character_prompt(character_name: str, traits: Dict = None) -> str:
+        return f"""
 You are a C++ expert for Unreal Engine 4.27.
 
 Generate a complete ACharacter subclass for a character named {character_name}.
 
 Traits for this character:
-{json.dumps(traits, indent=2)}
+{json.dumps(traits or {}, indent=2)}
 
 Requirements:
 1. Use proper UCLASS and UPROPERTY macros
@@ -345,48 +3626,29 @@ Provide:
 
 Format as JSON with keys: "header_file", "source_file"
 """
+    
+    def generate_character_class(self, character_name: str, traits: Dict, bypass_cache: bool = False,
+                                 stream: bool = False, on_progress: Callable[[Dict], None] = None) -> Dict:
+        """
+        Generate a complete UE4 character class with consciousness integration.
+        bypass_cache=True always asks the model (and refreshes the cached entry).
         
+        stream=True consumes the completion as it is generated and writes the
+        .h as soon as header_file is complete, so a live reload can start on it
+        while source_file is still coming. on_progress(event) is called with
+        {"name", "chars", "field", "path"}: field/path are set when a member
+        completes (path when a file was written), otherwise it reports the
+        characters received so far.
+        """
         try:
-            # Call LM Studio
-            import requests
-            response = requests.post(
-                f"{self.lm_studio_url}/v1/chat/completions",
-                json={
-                    "model": "local-model",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.3,
-                    "max_tokens": 2000
-                },
-                timeout=30
-            )
-            
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            # Parse JSON response
-            code_files = json.loads(content)
-            
-            # Save files
-            if self.output_dir:
-                header_path = self.output_dir / f"{character_name}.h"
-                source_path = self.output_dir / f"{character_name}.cpp"
-                
-                header_path.write_text(code_files.get('header_file', ''))
-                source_path.write_text(code_files.get('source_file', ''))
-                
-                logger.info(f"Generated {character_name} character class")
-            
-            return code_files
-        
+            return self._generate('character', character_name, {'traits': traits}, bypass_cache, stream, on_progress)
         except Exception as e:
-            logger.error(f"Code generation failed: {e}")
+            logger.error("Code generation failed: %s", e)
             return {}
     
-    def generate_game_logic(self, system_name: str, description: str) -> Dict:
-        """
-        Generate game logic system based on description.
-        """
-        prompt = f"""
+    @staticmethod
+    def _game_logic_prompt(system_name: str, description: str = '') -> str:
+        return f"""
 You are a C++ expert for Unreal Engine 4.27.
 
 Generate a complete system for: {system_name}
@@ -397,11 +3659,284 @@ Create:
 2. Necessary structs/enums for the system
 3. Methods for core functionality
 
-Provide C++ header and source files as JSON.
+Provide C++ header and source files as JSON with keys: "header_file", "source_file"
 """
-        # Similar to above, call LM Studio
-        # ... implementation
-        pass
+    
+    def generate_game_logic(self, system_name: str, description: str, bypass_cache: bool = False) -> Dict:
+        """
+        Generate game logic system based on description.
+        """
+        try:
+            return self._generate('game_logic', system_name, {'description': description}, bypass_cache)
+        except Exception as e:
+            logger.error("Code generation failed: %s", e)
+            return {}
+    
+    def generate(self, kind: str, name: str, bypass_cache: bool = False, stream: bool = False,
+                 on_progress: Callable[[Dict], None] = None, **params) -> Dict:
+        """
+        Run the generation pipeline for a registered kind and return the
+        reply's fields; params go to the kind's prompt. Unlike the
+        generate_*() wrappers this raises on failure.
+        
+        The reply is requested over the pooled session, its JSON extracted
+        (fenced or not), checked to have every file field, and the files are
+        written atomically to output_dir. With stream=True each file is
+        written as soon as its field completes, before the rest of the reply
+        is validated.
+        """
+        return self._generate(kind, name, params, bypass_cache, stream, on_progress)
+    
+    def _generate(self, kind_name: str, name: str, params: Dict, bypass_cache: bool = False, stream: bool = False,
+                  on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        kind = self.kinds.get(kind_name)
+        if kind is None:
+            raise ValueError(f"Unknown generation kind: {kind_name}")
+        
+        paths = {}
+        if self.output_dir:
+            stem = re.sub(r'\W+', '', name) or kind.name
+            paths = {field: self.output_dir / template.format(name=stem) for field, template in kind.files.items()}
+        reported = set()
+        chars = 0
+        timings: Dict[str, float] = {}
+        mark = time.perf_counter()
+        
+        def lap(stage: str):
+            nonlocal mark
+            now = time.perf_counter()
+            timings[stage] = timings.get(stage, 0.0) + now - mark
+            mark = now
+        
+        def progress(field=None, path=None):
+            if on_progress is not None:
+                on_progress({'name': name, 'chars': chars, 'field': field, 'path': path})
+        
+        def field_done(field: str, value):
+            if field in reported:
+                return
+            reported.add(field)
+            path = paths.get(field) if isinstance(value, str) else None
+            if path is not None:
+                _write_atomic(path, value)
+            progress(field, path)
+        
+        prompt = kind.prompt(name, **params)
+        lap('prompt')
+        
+        key = cached = None
+        if self.cache is not None:
+            key = self.cache.key_for(prompt, self.model,
+                                     {'temperature': self.temperature, 'max_tokens': self.max_tokens})
+            cached = None if bypass_cache else self.cache.get(key)
+            lap('cache')
+        
+        if cached is not None:
+            result = cached
+        elif stream:
+            parser = IncrementalJsonObject()
+            for delta in self._stream_completion(prompt):
+                chars += len(delta)
+                progress()
+                for field, value in parser.feed(delta):
+                    if field in kind.files:
+                        field_done(field, value)
+            lap('request')
+            result = parser.result()
+            lap('extract')
+        else:
+            content = self._complete(prompt)
+            lap('request')
+            result = extract_json(content)
+            lap('extract')
+        
+        for field in kind.files:
+            value = result.get(field)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"Generated {kind.label} has no {field}")
+        if kind.validate is not None:
+            kind.validate(result)
+        lap('validate')
+        
+        if cached is None and key is not None:
+            self.cache.put(key, result)
+            lap('cache')
+        
+        for field, value in result.items():
+            field_done(field, value)
+        lap('write')
+        
+        self._record_timings(kind.name, timings)
+        if paths:
+            logger.info("Generated %s %s", name, kind.label)
+        return result
+    
+    def _record_timings(self, kind: str, timings: Dict[str, float]):
+        with self._lock:
+            for stage, seconds in timings.items():
+                histogram = self._stage_times.get((kind, stage))
+                if histogram is None:
+                    histogram = self._stage_times[(kind, stage)] = Histogram()
+                histogram.observe(seconds)
+    
+    def stats(self) -> Dict:
+        """Where generation time goes: {kind: {stage: {"count", "total_s", "mean_ms"}}}."""
+        with self._lock:
+            stages = [(key, histogram.count, histogram.sum) for key, histogram in self._stage_times.items()]
+        result: Dict[str, Dict] = {}
+        for (kind, stage), count, total in stages:
+            result.setdefault(kind, {})[stage] = {
+                'count': count,
+                'total_s': total,
+                'mean_ms': total / count * 1000 if count else 0.0,
+            }
+        return result
+    
+    def _stream_completion(self, prompt: str) -> Iterator[str]:
+        """Content deltas from a streamed (server-sent events) chat completion."""
+        with self._limit:
+            response = self._http().post(
+                f"{self.lm_studio_url}/v1/chat/completions",
+                json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": self.temperature,
+                    "max_tokens": self.max_tokens,
+                    "stream": True
+                },
+                timeout=(self.connect_timeout, self.timeout),
+                stream=True
+            )
+            try:
+                response.raise_for_status()
+                response.encoding = response.encoding or 'utf-8'
+                # Read through to the end of the body (past [DONE]) so the
+                # connection goes back to the pool instead of being dropped
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        continue
+                    delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+            finally:
+                response.close()
+    
+    def generate_batch(self, specs: List[Dict], max_in_flight: int = None, retries: int = 3,
+                       backoff: float = 0.5, max_backoff: float = 8.0) -> Iterator[Dict]:
+        """
+        Generate many classes concurrently, yielding each result as it completes.
+        
+        A spec is {"kind": "character" | "game_logic" | any registered kind,
+        "name": ..., "priority": n, "bypass_cache": bool} plus the kind's
+        prompt params ("traits", "description", ...); lower priority values
+        start first.
+        Up to max_in_flight run at once. It defaults to, and is clamped to,
+        max_concurrency: every request shares the generator's semaphore and
+        connection pool, so that is the hard cap. Transient
+        failures (connection errors, timeouts, 408/429/5xx) are retried up to
+        `retries` times with jittered exponential backoff. Yields
+        {"spec", "result", "error", "attempts", "elapsed"}; result is None on failure.
+        """
+        limit = min(max_in_flight or self.max_concurrency, self.max_concurrency)
+        ready = [(spec.get('priority', 0), index, spec, 1) for index, spec in enumerate(specs)]
+        heapq.heapify(ready)
+        delayed = []  # (retry_at, priority, index, spec, attempt)
+        running: Dict[Future, tuple] = {}
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix='ue_codegen_batch')
+        
+        try:
+            while ready or delayed or running:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, priority, index, spec, attempt = heapq.heappop(delayed)
+                    heapq.heappush(ready, (priority, index, spec, attempt))
+                while ready and len(running) < limit:
+                    priority, index, spec, attempt = heapq.heappop(ready)
+                    running[executor.submit(self._generate_spec, spec)] = (priority, index, spec, attempt)
+                
+                timeout = max(0.0, delayed[0][0] - now) if delayed else None
+                done, _ = wait_futures(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    priority, index, spec, attempt = running.pop(future)
+                    error = future.exception()
+                    if error is not None and attempt <= retries and self._is_transient(error):
+                        delay = min(max_backoff, backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                        heapq.heappush(delayed, (time.monotonic() + delay, priority, index, spec, attempt + 1))
+                        continue
+                    if error is not None:
+                        logger.error("Code generation failed for %s: %s", spec.get('name'), error)
+                    yield {
+                        'spec': spec,
+                        'result': None if error is not None else future.result(),
+                        'error': None if error is None else str(error),
+                        'attempts': attempt,
+                        'elapsed': time.perf_counter() - started,
+                    }
+        finally:
+            # Also runs when the caller stops iterating early
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _generate_spec(self, spec: Dict) -> Dict:
+        params = {key: value for key, value in spec.items() if key not in self._SPEC_KEYS}
+        return self._generate(spec.get('kind', 'character'), spec['name'], params, spec.get('bypass_cache', False))
+    
+    @staticmethod
+    def _is_transient(error: BaseException) -> bool:
+        """Worth retrying: the server was busy or unreachable, not the request itself."""
+        import requests
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in (408, 429, 500, 502, 503, 504)
+        return False
+    
+    async def agenerate_character_class(self, character_name: str, traits: Dict, bypass_cache: bool = False,
+                                        stream: bool = False, on_progress: Callable[[Dict], None] = None) -> Dict:
+        """
+        asyncio variant of generate_character_class(). Many can be awaited at
+        once (e.g. with asyncio.gather); at most max_concurrency hit the server.
+        on_progress runs on a generator thread, not the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._async_limit(loop):
+            return await loop.run_in_executor(self._pool(), self.generate_character_class, character_name, traits,
+                                              bypass_cache, stream, on_progress)
+    
+    def _async_limit(self, loop) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop, so keep one per loop
+        with self._lock:
+            limit = self._async_limits.get(loop)
+            if limit is None:
+                limit = self._async_limits[loop] = asyncio.Semaphore(self.max_concurrency)
+            return limit
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix='ue_codegen')
+            return self._executor
+    
+    def close(self):
+        """Close pooled connections and the generation threads."""
+        with self._lock:
+            session, self._session = self._session, None
+            executor, self._executor = self._executor, None
+            self._async_limits.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if session is not None:
+            session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
 
 
 class LiveReloadManager:
@@ -433,7 +3968,7 @@ class LiveReloadManager:
                 time.sleep(0.5)  # Check every 500ms
             
             except Exception as e:
-                logger.error(f"Watch error: {e}")
+                logger.error("Watch error: %s", e)
                 time.sleep(1)
     
     def stop(self):
@@ -451,9 +3986,16 @@ def create_consciousness_bridge(vibe_miracle_runtime) -> UnrealBridge:
 
 # Example usage
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     print("[AuraNova Studios] UE Bridge ready")
     print("This module integrates Python AI with Unreal Engine")
     print("\nUsage:")
     print("  bridge = UnrealBridge()")
-    print("  bridge.start_server()")
+    print("  bridge.start_server()                 # thread per connection")
+    print("  bridge.start_server(mode='asyncio')   # single event loop")
+    print("  bridge.start_shared_memory_server()   # same-host client, see SharedMemoryClient")
+    print("  bridge.start_datagram_server()        # UDP for loss-tolerant input axes")
+    print("  configure_logging()                   # async log writer for production")
     print("  # UE4 can now send/receive messages")
+    print("\nBenchmark without Unreal:")
+    print("  python -m ue_bridge_bench --clients 32 --latency 0.002 --json results.json")
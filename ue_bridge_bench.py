@@ -0,0 +1,1308 @@
+"""
+UE BRIDGE BENCHMARK - AuraNova Studios
+Measures UnrealBridge server throughput without a running Unreal Engine.
+
+Runs the bridge in a child process against a stub consciousness collective
+and drives it with simulated UE clients from this process, so client and
+server don't fight over the same GIL.
+
+Usage:
+  python -m ue_bridge_bench
+  python -m ue_bridge_bench --clients 64 --requests 20000 --latency 0.002 --json results.json
+  python -m ue_bridge_bench --mix decision_request=4,dialogue_request=1,input_received=3,game_state_update=2
+  python ue_bridge_bench.py --connect --modes thread asyncio --clients 64 --connections 4000
+  python ue_bridge_bench.py --batch-sizes 1 4 16 64 --latency 0.002
+  python ue_bridge_bench.py --outbound 5000
+  python ue_bridge_bench.py --codecs --actors 1 10 100 1000
+  python ue_bridge_bench.py --logging --requests 20000
+  python -m ue_bridge_bench --transports --requests 20000
+  python -m ue_bridge_bench --datagram 0 0.01 0.05
+  python -m ue_bridge_bench --codegen 32 --concurrency 8 --latency 0.05
+  python -m ue_bridge_bench --batch 48 --concurrency 8 --fail-rate 0.1
+  python -m ue_bridge_bench --cache 24 --latency 0.2
+  python -m ue_bridge_bench --replay traffic.log --speed 0
+  python -m ue_bridge_bench --replay traffic.log --target localhost:6969 --speed 1
+"""
+
+import argparse
+import asyncio
+import json
+import datetime
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+
+class StubMoodRing:
+    def __init__(self):
+        self.current_mood = "calm"
+
+
+class StubEmotionLink:
+    def __init__(self):
+        self.mood_ring = StubMoodRing()
+
+
+class StubConsciousness:
+    """Stands in for a VIBE MIRACLE agent with a tunable decision latency."""
+
+    def __init__(self, name: str, latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.emotion_link = StubEmotionLink()
+
+    def make_decision(self, options: List, context: Dict, extra: Dict) -> Dict:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._decide(options)
+
+    def make_decisions(self, requests: List) -> List[Dict]:
+        """Batched API: one model round trip for the whole batch."""
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._decide(options) for options, context, extra in requests]
+
+    @staticmethod
+    def _decide(options: List) -> Dict:
+        action = options[0] if options else 'wait'
+        return {'action': action, 'parameters': {}, 'reasoning': 'stub'}
+
+    def generate_dialogue(self, context: Dict) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return f"{self.name} has something to say."
+
+    def learn_from_consequence(self, experience: Dict):
+        pass
+
+
+class StubCollective:
+    """Minimal collective exposing get_consciousness() like VIBE MIRACLE."""
+
+    AGENTS = ['Aura', 'Nova', 'Cipher', 'Echo', 'Lumen']
+
+    def __init__(self, latency: float = 0.0):
+        self.agents = {name: StubConsciousness(name, latency) for name in self.AGENTS}
+
+    def get_consciousness(self, agent_name: str):
+        return self.agents.get(agent_name)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def _serve(mode: str, port: int, latency: float, ready, stop, options: Dict = None, shm_name: str = None):
+    """Child process entry point: run a bridge until told to stop."""
+    from ue_bridge import UnrealBridge
+
+    logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+    bridge = UnrealBridge(ue_project_path='.', port=port, **(options or {}))
+    bridge.connect_consciousness(StubCollective(latency))
+    bridge.start_server(mode=mode)
+    if shm_name:
+        bridge.start_shared_memory_server(shm_name)
+    ready.set()
+    stop.wait()
+    bridge.stop()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted sample list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def _connect_once(port: int, message: bytes) -> float:
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection('localhost', port)
+    writer.write(message)
+    await writer.drain()
+    await reader.read(4096)
+    writer.close()
+    await writer.wait_closed()
+    return time.perf_counter() - start
+
+
+async def _drive_connections(port: int, clients: int, connections: int) -> Dict:
+    message = json.dumps({
+        'command': 'decision_request',
+        'agent_name': 'Aura',
+        'options': ['attack', 'defend'],
+        'context': {}
+    }).encode()
+    latencies: List[float] = []
+    errors = 0
+    remaining = connections
+
+    async def client():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            try:
+                latencies.append(await _connect_once(port, message))
+            except OSError:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'connections': len(latencies),
+        'errors': errors,
+        'connections_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def _run_against_server(mode: str, latency: float, drive: Callable[[int], Dict], options: Dict = None,
+                        shm_name: str = None) -> Dict:
+    """Start a bridge in a child process, run drive(port) against it, then stop it."""
+    port = _free_port()
+    ready = multiprocessing.Event()
+    stop = multiprocessing.Event()
+    server = multiprocessing.Process(target=_serve, args=(mode, port, latency, ready, stop, options, shm_name),
+                                     daemon=True)
+    server.start()
+
+    try:
+        if not ready.wait(10):
+            raise RuntimeError(f"Bridge in mode {mode} did not start")
+        return drive(port)
+    finally:
+        stop.set()
+        server.join(timeout=10)
+
+
+def bench_server_mode(mode: str, clients: int, connections: int, latency: float = 0.0) -> Dict:
+    """Connect/request/close throughput and latency for one server mode."""
+    result = _run_against_server(mode, latency, lambda port: asyncio.run(_drive_connections(port, clients, connections)))
+    result['mode'] = mode
+    return result
+
+
+DEFAULT_MIX = {
+    'decision_request': 4,
+    'dialogue_request': 1,
+    'input_received': 3,
+    'game_state_update': 2,
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "decision_request=4,input_received=1" into a weight per command."""
+    mix = {}
+    for part in text.split(','):
+        command, _, weight = part.partition('=')
+        mix[command.strip()] = float(weight or 1)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Unknown commands in mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class SimulatedClient:
+    """Builds the messages one UE client sends, including its own world-state versions."""
+
+    def __init__(self, index: int, mix: Dict[str, float], actors: int = 20, seed: int = 0):
+        self.index = index
+        self.world_agent = f'client-{index}'
+        self.actors = actors
+        self.version = None
+        self.tick = 0
+        self.random = random.Random(seed * 1000003 + index)
+        self.commands = list(mix)
+        self.weights = [mix[c] for c in self.commands]
+
+    def next_message(self) -> Dict:
+        self.tick += 1
+        command = self.random.choices(self.commands, self.weights)[0]
+        agent = StubCollective.AGENTS[(self.index + self.tick) % len(StubCollective.AGENTS)]
+
+        if command == 'decision_request':
+            return {'command': command, 'agent_name': agent, 'options': ['attack', 'defend', 'flee'],
+                    'context': {'tick': self.tick, 'threat': self.random.random()}}
+        if command == 'dialogue_request':
+            return {'command': command, 'agent_name': agent, 'context': {'tick': self.tick}}
+        if command == 'input_received':
+            return {'command': command, 'agent_name': agent,
+                    'input_type': self.random.choice(['jump', 'attack', 'interact'])}
+        return self._world_update()
+
+    def _world_update(self) -> Dict:
+        version = (self.version or 0) + 1
+        if self.version is None:
+            message = {'full': True, 'entities': {
+                f'actor_{i}': {'location': [i * 10.0, 0.0, 88.0], 'health': 100, 'state': 'idle'}
+                for i in range(self.actors)
+            }}
+        else:
+            moved = self.random.randrange(self.actors)
+            message = {'base_version': self.version, 'entities': {
+                f'actor_{moved}': {'location': [moved * 10.0, self.tick * 1.0, 88.0]}
+            }}
+        message.update({'command': 'game_state_update', 'agent_name': self.world_agent, 'version': version})
+        return message
+
+    def on_response(self, message: Dict, response: Dict):
+        if message['command'] == 'game_state_update':
+            self.version = response.get('version') if response.get('status') == 'ok' else None
+
+
+async def _drive_mix(port: int, clients: int, requests: int, mix: Dict[str, float], seed: int) -> Dict:
+    latencies: Dict[str, List[float]] = {command: [] for command in mix}
+    errors: Dict[str, int] = {command: 0 for command in mix}
+    remaining = requests
+
+    async def client(index: int):
+        nonlocal remaining
+        simulated = SimulatedClient(index, mix, seed=seed)
+        reader, writer = await asyncio.open_connection('localhost', port)
+        try:
+            writer.write(json.dumps({'command': 'handshake', 'framing': 'ndjson'}).encode())
+            await writer.drain()
+            if json.loads(await reader.read(4096)).get('status') != 'ok':
+                raise RuntimeError("Handshake rejected")
+
+            while remaining > 0:
+                remaining -= 1
+                message = simulated.next_message()
+                message['request_id'] = simulated.tick
+                start = time.perf_counter()
+                writer.write(json.dumps(message).encode() + b'\n')
+                await writer.drain()
+                line = await reader.readline()
+                elapsed = time.perf_counter() - start
+                if not line:
+                    raise ConnectionError("Bridge closed the connection")
+
+                response = json.loads(line)
+                if response.get('status') in ('error', 'overloaded'):
+                    errors[message['command']] += 1
+                else:
+                    latencies[message['command']].append(elapsed)
+                simulated.on_response(message, response)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(client(i) for i in range(clients)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    def summary(samples: List[float]) -> Dict:
+        return {
+            'count': len(samples),
+            'mean_ms': sum(samples) / len(samples) * 1000 if samples else 0.0,
+            'p50_ms': percentile(samples, 50) * 1000,
+            'p95_ms': percentile(samples, 95) * 1000,
+            'p99_ms': percentile(samples, 99) * 1000,
+        }
+
+    everything = [sample for samples in latencies.values() for sample in samples]
+    result = summary(everything)
+    result.update({
+        'elapsed_s': elapsed,
+        'requests_per_sec': len(everything) / elapsed if elapsed else 0.0,
+        'errors': sum(errors.values()),
+        'client_failures': sum(1 for outcome in outcomes if isinstance(outcome, Exception)),
+        'commands': {command: dict(summary(samples), errors=errors[command])
+                     for command, samples in latencies.items()},
+    })
+    return result
+
+
+def bench_load(mode: str = 'asyncio', clients: int = 32, requests: int = 2000, latency: float = 0.0,
+               mix: Dict[str, float] = None, seed: int = 0, options: Dict = None) -> Dict:
+    """
+    Simulated UE clients on persistent NDJSON connections sending a weighted
+    command mix, one request in flight each; per-command and overall latency.
+    """
+    mix = mix or DEFAULT_MIX
+    result = _run_against_server(mode, latency, lambda port: asyncio.run(_drive_mix(port, clients, requests, mix, seed)),
+                                 options)
+    result['config'] = {
+        'mode': mode, 'clients': clients, 'requests': requests, 'latency': latency,
+        'mix': mix, 'seed': seed, 'options': options or {},
+    }
+    return result
+
+
+def bench_decision_batching(batch_size: int, requests: int, latency: float, window: float = 0.002) -> Dict:
+    """Decision throughput through the worker pool for one batch size (no sockets)."""
+    from ue_bridge import UnrealBridge
+
+    logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+    bridge = UnrealBridge(ue_project_path='.', decision_batch_size=batch_size, decision_batch_window=window)
+    bridge.connect_consciousness(StubCollective(latency))
+    agents = StubCollective.AGENTS
+
+    start = time.perf_counter()
+    futures = [
+        bridge.dispatch({
+            'command': 'decision_request',
+            'agent_name': agents[i % len(agents)],
+            'options': ['attack', 'defend'],
+            'context': {'tick': i}
+        })
+        for i in range(requests)
+    ]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+    bridge.workers.shutdown()
+
+    return {
+        'batch_size': batch_size,
+        'requests': requests,
+        'decisions_per_sec': requests / elapsed if elapsed else 0.0,
+    }
+
+
+def _sink_server() -> tuple:
+    """A stand-in for the editor's listener on 6970: accepts and discards everything."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('localhost', 0))
+    server.listen(128)
+
+    def drain(conn):
+        with conn:
+            while conn.recv(65536):
+                pass
+
+    def accept():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=drain, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return server, server.getsockname()[1]
+
+
+def bench_outbound(messages: int) -> Dict:
+    """Per-message cost of connect-per-message pushes vs the pooled outbound channel."""
+    from ue_bridge import OutboundChannel
+
+    server, port = _sink_server()
+    message = {'command': 'emotion_state', 'agent_name': 'Aura', 'emotion': 'curious', 'intensity': 0.7}
+
+    try:
+        start = time.perf_counter()
+        for _ in range(messages):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.connect(('localhost', port))
+            sock.sendall(json.dumps(message).encode())
+            sock.close()
+        per_connection = (time.perf_counter() - start) / messages
+
+        channel = OutboundChannel('localhost', port, max_queue=messages)
+        start = time.perf_counter()
+        for _ in range(messages):
+            channel.send(message)
+        channel.flush()
+        pooled = (time.perf_counter() - start) / messages
+        channel.close()
+    finally:
+        server.close()
+
+    return {
+        'messages': messages,
+        'connect_per_message_us': per_connection * 1e6,
+        'pooled_us': pooled * 1e6,
+        'speedup': per_connection / pooled if pooled else 0.0,
+    }
+
+
+def game_state_message(actors: int) -> Dict:
+    """A game_state_update carrying `actors` actors, roughly what UE sends per tick."""
+    return {
+        'command': 'game_state_update',
+        'tick': 1024,
+        'actors': [
+            {
+                'id': f'BP_NPC_{i}',
+                'agent_name': StubCollective.AGENTS[i % len(StubCollective.AGENTS)],
+                'location': [i * 12.5, -i * 3.25, 88.0],
+                'rotation': [0.0, i % 360 * 1.0, 0.0],
+                'velocity': [1.5, 0.0, -0.25],
+                'health': 100 - i % 100,
+                'state': 'patrolling',
+            }
+            for i in range(actors)
+        ],
+    }
+
+
+def bench_codecs(actor_counts: List[int], iterations: int = 200) -> List[Dict]:
+    """Bytes on the wire and encode/decode time for every installed codec."""
+    from ue_bridge import available_codecs
+
+    results = []
+    for actors in actor_counts:
+        message = game_state_message(actors)
+        for name, codec in available_codecs().items():
+            payload = codec.encode(message)
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                codec.encode(message)
+            encode_time = (time.perf_counter() - start) / iterations
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                codec.decode(payload)
+            decode_time = (time.perf_counter() - start) / iterations
+
+            results.append({
+                'actors': actors,
+                'codec': name,
+                'bytes': len(payload),
+                'encode_us': encode_time * 1e6,
+                'decode_us': decode_time * 1e6,
+            })
+    return results
+
+
+def _dispatch_rate(bridge, requests: int) -> float:
+    agents = StubCollective.AGENTS
+    start = time.perf_counter()
+    futures = [
+        bridge.dispatch({
+            'command': 'input_received' if i % 2 else 'decision_request',
+            'agent_name': agents[i % len(agents)],
+            'input_type': 'damage',
+            'options': ['attack', 'defend'],
+            'context': {'tick': i}
+        })
+        for i in range(requests)
+    ]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+    return requests / elapsed if elapsed else 0.0
+
+
+def bench_logging(requests: int, sample_rate: float = 0.01) -> List[Dict]:
+    """Message throughput with logging off, synchronous, and queued + sampled."""
+    import ue_bridge
+    from ue_bridge import LogSampler, UnrealBridge
+
+    bridge_logger = logging.getLogger('ue_bridge')
+    sink = open(os.devnull, 'w')
+    results = []
+
+    def run(label: str, sampler: LogSampler = None):
+        bridge = UnrealBridge(ue_project_path='.', log_sampler=sampler)
+        bridge.connect_consciousness(StubCollective())
+        _dispatch_rate(bridge, min(requests, 500))  # Warm up the pool
+        rate = _dispatch_rate(bridge, requests)
+        bridge.workers.shutdown()
+        results.append({'logging': label, 'messages_per_sec': rate})
+
+    saved = bridge_logger.handlers[:], bridge_logger.level, bridge_logger.propagate
+    try:
+        bridge_logger.handlers, bridge_logger.propagate = [], False
+        bridge_logger.setLevel(logging.WARNING)
+        run('off')
+
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter(ue_bridge.LOG_FORMAT))
+        bridge_logger.handlers = [handler]
+        bridge_logger.setLevel(logging.INFO)
+        run('sync, every message')
+
+        bridge_logger.handlers = []
+        listener = ue_bridge.configure_logging(handler=logging.StreamHandler(sink))
+        run(f'queued, sampled {sample_rate:g}', LogSampler(default_rate=sample_rate))
+        listener.stop()
+    finally:
+        bridge_logger.handlers, level, bridge_logger.propagate = saved
+        bridge_logger.setLevel(level)
+        sink.close()
+
+    baseline = results[0]['messages_per_sec']
+    for r in results:
+        r['relative'] = r['messages_per_sec'] / baseline if baseline else 0.0
+    return results
+
+
+def _transport_messages(count: int) -> List[Dict]:
+    """High-frequency traffic: alternating inputs and small world-state deltas."""
+    client = SimulatedClient(0, {'input_received': 1, 'game_state_update': 1}, actors=5)
+    messages = []
+    version = 0
+    for _ in range(count):
+        message = client.next_message()
+        if message['command'] == 'game_state_update':
+            # Precomputed, so versions are chained here instead of from responses
+            message['version'] = version + 1
+            if version:
+                message.pop('full', None)
+                message['base_version'] = version
+            version += 1
+        messages.append(message)
+    return messages
+
+
+def _latency_summary(samples: List[float]) -> Dict:
+    return {
+        'requests': len(samples),
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p95_us': percentile(samples, 95) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+    }
+
+
+def bench_transports(requests: int, mode: str = 'thread') -> List[Dict]:
+    """Request/response latency over TCP loopback vs the shared memory ring, one request at a time."""
+    from ue_bridge import SharedMemoryClient
+
+    messages = _transport_messages(requests)
+    shm_name = f'ue_bridge_bench_{os.getpid()}'
+
+    def drive(port: int) -> List[Dict]:
+        results = []
+
+        sock = socket.create_connection(('localhost', port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.sendall(json.dumps({'command': 'handshake', 'framing': 'ndjson'}).encode())
+        sock.recv(4096)
+        stream = sock.makefile('rb')
+        samples = []
+        for message in messages:
+            payload = json.dumps(message).encode() + b'\n'
+            start = time.perf_counter()
+            sock.sendall(payload)
+            stream.readline()
+            samples.append(time.perf_counter() - start)
+        sock.close()
+        results.append(dict(_latency_summary(samples), transport=f'tcp ({mode})'))
+
+        with SharedMemoryClient(shm_name) as client:
+            samples = []
+            for message in messages:
+                start = time.perf_counter()
+                client.request(message)
+                samples.append(time.perf_counter() - start)
+        results.append(dict(_latency_summary(samples), transport='shared memory'))
+        return results
+
+    return _run_against_server(mode, 0.0, drive, shm_name=shm_name)
+
+
+def _lossy_udp_relay(target_port: int, loss: float, rng: random.Random) -> tuple:
+    """Forwards datagrams to target_port, dropping each with probability `loss`."""
+    relay = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    relay.bind(('localhost', 0))
+    out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def forward():
+        while True:
+            try:
+                payload, _ = relay.recvfrom(65535)
+            except OSError:
+                return
+            if rng.random() >= loss:
+                out.sendto(payload, ('localhost', target_port))
+
+    threading.Thread(target=forward, daemon=True).start()
+    return relay, relay.getsockname()[1]
+
+
+def _lossy_tcp_relay(target_port: int, loss: float, rto: float, rng: random.Random) -> tuple:
+    """
+    Forwards a TCP stream to target_port. Each forwarded chunk is "lost" with
+    probability `loss` and held for one retransmission timeout, and everything
+    behind it waits too: TCP's head-of-line blocking, without needing netem.
+    """
+    relay = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    relay.bind(('localhost', 0))
+    relay.listen(8)
+
+    def pipe(source, sink, lossy: bool):
+        try:
+            while True:
+                chunk = source.recv(65536)
+                if not chunk:
+                    break
+                if lossy and rng.random() < loss:
+                    time.sleep(rto)
+                sink.sendall(chunk)
+        except OSError:
+            pass
+        finally:
+            sink.close()
+
+    def accept():
+        while True:
+            try:
+                conn, _ = relay.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(('localhost', target_port))
+            threading.Thread(target=pipe, args=(conn, upstream, True), daemon=True).start()
+            threading.Thread(target=pipe, args=(upstream, conn, False), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return relay, relay.getsockname()[1]
+
+
+def bench_datagram(updates: int = 2000, rate: float = 1000.0, losses: List[float] = (0.0, 0.01, 0.05),
+                   rto: float = 0.2, seed: int = 0) -> List[Dict]:
+    """
+    Emotion-state pushes over the pooled TCP channel vs the UDP datagram channel,
+    through relays that simulate packet loss. Reports send-to-handler latency
+    and how many updates arrived; over UDP a lost update is simply superseded.
+    """
+    from ue_bridge import UnrealBridge
+
+    logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+    results = []
+
+    for loss in losses:
+        for transport in ('tcp', 'udp'):
+            received: List[float] = []
+            receiver = UnrealBridge(ue_project_path='.', port=_free_port())
+            receiver.register_handler('emotion_state', lambda m: received.append(time.perf_counter() - m['sent_at']))
+            sender = UnrealBridge(ue_project_path='.')
+            rng = random.Random(seed)
+
+            if transport == 'tcp':
+                receiver.start_server()
+                relay, relay_port = _lossy_tcp_relay(receiver.port, loss, rto, rng)
+                push = lambda message: sender.send_to_ue(message, port=relay_port)
+            else:
+                udp_port = receiver.start_datagram_server(port=0, commands={'emotion_state'})
+                relay, relay_port = _lossy_udp_relay(udp_port, loss, rng)
+                push = lambda message: sender.send_datagram_to_ue(message, port=relay_port)
+
+            interval = 1.0 / rate
+            start = time.perf_counter()
+            for i in range(updates):
+                delay = start + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                push({
+                    'command': 'emotion_state',
+                    'agent_name': StubCollective.AGENTS[i % len(StubCollective.AGENTS)],
+                    'emotion': 'curious',
+                    'intensity': (i % 100) / 100.0,
+                    'sent_at': time.perf_counter(),
+                })
+            time.sleep(rto * 2 + 0.2)  # Let retransmissions land
+
+            relay.close()
+            sender.stop()
+            receiver.stop()
+            results.append({
+                'transport': transport,
+                'loss': loss,
+                'sent': updates,
+                'delivered': len(received),
+                'p50_ms': percentile(received, 50) * 1000,
+                'p99_ms': percentile(received, 99) * 1000,
+                'max_ms': max(received, default=0.0) * 1000,
+            })
+    return results
+
+
+class StubLMServer:
+    """
+    Local stand-in for LM Studio's /v1/chat/completions with tunable latency.
+
+    Speaks HTTP/1.1 keep-alive and counts TCP connections, so callers can check
+    that a client actually reuses them. Requests with "stream": true get the
+    content as server-sent events, token_chars at a time, spread evenly over
+    the latency. Usable from tests as a context manager.
+    """
+
+    def __init__(self, latency: float = 0.05, port: int = 0, jitter: float = 0.0, fail_rate: float = 0.0,
+                 seed: int = 0, token_chars: int = 8):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        stub = self
+        self.latency = latency
+        self.jitter = jitter  # Each request takes latency * uniform(1 - jitter, 1 + jitter)
+        self.fail_rate = fail_rate  # Fraction answered 503, like a busy model server
+        self.token_chars = token_chars
+        self.requests = 0
+        self.failures = 0
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0  # Most requests in progress at once
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                with stub._lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    delay = stub.latency * stub._random.uniform(1 - stub.jitter, 1 + stub.jitter)
+                    failed = stub._random.random() < stub.fail_rate
+                    stub.failures += failed
+                try:
+                    self._respond(body, delay, failed)
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def _respond(self, body: Dict, delay: float, failed: bool):
+                if body.get('stream') and not failed:
+                    self._stream(stub.completion(body)['choices'][0]['message']['content'], delay)
+                    return
+                time.sleep(delay)
+                if failed:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                payload = json.dumps(stub.completion(body)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, content: str, delay: float):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                step = stub.token_chars
+                tokens = [content[i:i + step] for i in range(0, len(content), step)]
+                start = time.perf_counter()
+                for i, token in enumerate(tokens):
+                    time.sleep(max(0.0, start + delay * (i + 1) / len(tokens) - time.perf_counter()))
+                    event = {'choices': [{'index': 0, 'delta': {'content': token}}]}
+                    self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b'')
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('localhost', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://localhost:{self.server.server_address[1]}"
+
+    def completion(self, body: Dict) -> Dict:
+        """The response for one request; override to script other model outputs."""
+        prompt = body['messages'][-1]['content']
+        name = prompt.split('character named ')[-1].split('.')[0] if 'character named ' in prompt else 'System'
+        content = json.dumps({
+            'header_file': f'#pragma once\nUCLASS()\nclass A{name} : public ACharacter {{ GENERATED_BODY() }};\n',
+            'source_file': f'#include "{name}.h"\n' + ''.join(
+                f'void A{name}::Step{i}(float DeltaTime) {{ Tick(DeltaTime); }}\n' for i in range(24)),
+        })
+        return {'choices': [{'message': {'role': 'assistant', 'content': content}}]}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def bench_codegen(classes: int = 32, latency: float = 0.05, concurrency: int = 8) -> List[Dict]:
+    """Character-class generation against a stub LM server: one-shot posts vs pooled async."""
+    import requests
+    from ue_bridge import CodeGenerator
+
+    logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+    traits = {'courage': 0.8, 'curiosity': 0.6}
+    results = []
+
+    with StubLMServer(latency) as stub:
+        start = time.perf_counter()
+        for i in range(classes):
+            requests.post(f"{stub.url}/v1/chat/completions", json={
+                'model': 'local-model',
+                'messages': [{'role': 'user', 'content': f'Generate a character named Npc{i}.'}],
+            }, timeout=30).json()
+        results.append({'client': 'requests.post, sequential', 'classes': classes,
+                        'elapsed_s': time.perf_counter() - start, 'connections': stub.connections})
+
+        stub.connections = 0
+        with CodeGenerator(stub.url, max_concurrency=concurrency) as generator:
+            async def generate_all():
+                return await asyncio.gather(*(
+                    generator.agenerate_character_class(f'Npc{i}', traits) for i in range(classes)
+                ))
+
+            start = time.perf_counter()
+            generated = asyncio.run(generate_all())
+            elapsed = time.perf_counter() - start
+        results.append({'client': f'pooled async, {concurrency} at once', 'classes': sum(1 for g in generated if g),
+                        'elapsed_s': elapsed, 'connections': stub.connections})
+    return results
+
+
+def bench_batch(classes: int = 48, latency: float = 0.05, in_flight: int = 8, fail_rate: float = 0.1) -> List[Dict]:
+    """
+    A level's worth of character classes against a jittery, sometimes-busy stub:
+    one at a time vs generate_batch. Reports time to first result and to all.
+    """
+    from ue_bridge import CodeGenerator
+
+    logging.getLogger('ue_bridge').setLevel(logging.CRITICAL)
+    specs = [{'kind': 'character', 'name': f'Npc{i}', 'traits': {'courage': i / classes}, 'priority': i % 3}
+             for i in range(classes)]
+    results = []
+
+    with StubLMServer(latency, jitter=0.8, fail_rate=fail_rate) as stub, \
+            CodeGenerator(stub.url, max_concurrency=in_flight) as generator:
+        start = time.perf_counter()
+        first = None
+        ok = 0
+        for spec in specs:
+            ok += bool(generator.generate_character_class(spec['name'], spec['traits']))
+            first = first or time.perf_counter() - start
+        results.append({'scheduler': 'sequential, no retry', 'succeeded': ok, 'first_s': first,
+                        'total_s': time.perf_counter() - start, 'requests': stub.requests})
+
+        stub.requests = 0
+        start = time.perf_counter()
+        first = None
+        ok = 0
+        for outcome in generator.generate_batch(specs, max_in_flight=in_flight, backoff=0.05):
+            ok += outcome['result'] is not None
+            first = first or time.perf_counter() - start
+        results.append({'scheduler': f'generate_batch, {in_flight} in flight', 'succeeded': ok, 'first_s': first,
+                        'total_s': time.perf_counter() - start, 'requests': stub.requests})
+    return results
+
+
+def bench_generation_cache(classes: int = 24, latency: float = 0.2, in_flight: int = 8) -> List[Dict]:
+    """Bootstrapping a cast of characters with a cold, then warm, GenerationCache."""
+    import tempfile
+    from ue_bridge import CodeGenerator, GenerationCache
+
+    logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+    specs = [{'kind': 'character', 'name': f'Npc{i}', 'traits': {'courage': i / classes}} for i in range(classes)]
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory, StubLMServer(latency) as stub:
+        cache = GenerationCache(Path(directory) / 'cache')
+        with CodeGenerator(stub.url, max_concurrency=in_flight, cache=cache) as generator:
+            generator.set_output_dir(Path(directory) / 'Source')
+            for run in ('cold', 'warm'):
+                stub.requests = 0
+                start = time.perf_counter()
+                per_class = [outcome['elapsed'] for outcome in generator.generate_batch(specs)]
+                results.append({
+                    'cache': run,
+                    'classes': len(per_class),
+                    'total_s': time.perf_counter() - start,
+                    'first_ms': min(per_class) * 1000,
+                    'model_requests': stub.requests,
+                })
+
+            start = time.perf_counter()
+            generator.generate_character_class('Npc0', specs[0]['traits'])
+            hit_ms = (time.perf_counter() - start) * 1000
+        results.append({'cache': 'single hit', 'classes': 1, 'total_s': hit_ms / 1000, 'first_ms': hit_ms,
+                        'model_requests': 0})
+    return results
+
+
+def bench_streaming(classes: int = 8, latency: float = 1.0, in_flight: int = 4) -> List[Dict]:
+    """Time until each class's .h is on disk, with and without streaming the completion."""
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from ue_bridge import CodeGenerator
+
+    logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory, StubLMServer(latency) as stub:
+        for stream in (False, True):
+            with CodeGenerator(stub.url, max_concurrency=in_flight) as generator:
+                generator.set_output_dir(Path(directory) / ('stream' if stream else 'whole'))
+                header_at, events = {}, []
+                lock = threading.Lock()
+                start = time.perf_counter()
+
+                def on_progress(event):
+                    with lock:
+                        events.append(event)
+                        if event['field'] == 'header_file':
+                            header_at[event['name']] = time.perf_counter() - start
+
+                def generate(i):
+                    name = f'Npc{i}'
+                    generator.generate_character_class(name, {'courage': 0.5}, stream=stream,
+                                                       on_progress=on_progress if stream else None)
+                    done = time.perf_counter() - start
+                    header_at.setdefault(name, done)
+                    return done
+
+                with ThreadPoolExecutor(in_flight) as pool:
+                    finished = list(pool.map(generate, range(classes)))
+            results.append({
+                'mode': 'stream' if stream else 'whole',
+                'classes': classes,
+                'header_p50_s': percentile(list(header_at.values()), 50),
+                'done_p50_s': percentile(finished, 50),
+                'total_s': max(finished),
+                'progress_events': len(events),
+            })
+    return results
+
+
+def bench_pipeline(classes: int = 24, latency: float = 0.2, in_flight: int = 8) -> List[Dict]:
+    """Per-stage generation time for characters and game logic systems, cold then warm cache."""
+    import tempfile
+    from ue_bridge import CodeGenerator, GenerationCache
+
+    logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+    specs = []
+    for i in range(classes):
+        if i % 2:
+            specs.append({'kind': 'game_logic', 'name': f'System{i}', 'description': f'System number {i}'})
+        else:
+            specs.append({'kind': 'character', 'name': f'Npc{i}', 'traits': {'courage': i / classes}})
+
+    with tempfile.TemporaryDirectory() as directory, StubLMServer(latency) as stub:
+        with CodeGenerator(stub.url, max_concurrency=in_flight, cache=GenerationCache(Path(directory) / 'cache')) \
+                as generator:
+            generator.set_output_dir(Path(directory) / 'Source')
+            for _ in range(2):
+                for _ in generator.generate_batch(specs):
+                    pass
+            stats = generator.stats()
+    return [{'kind': kind, 'stage': stage, **timing} for kind, stages in stats.items()
+            for stage, timing in stages.items()]
+
+
+def load_traffic(path: str) -> List[Dict]:
+    """Recorded requests, oldest first, each with its recorded response and handler time."""
+    from ue_bridge import read_traffic
+
+    requests, by_seq = [], {}
+    for record in read_traffic(path):
+        if 'in' in record:
+            entry = {'t': record['t'], 'message': record['in'], 'response': None, 'ms': None}
+            # Sequence numbers restart with each recorder; the latest request owns the number
+            by_seq[record['s']] = entry
+            requests.append(entry)
+        elif record.get('s') in by_seq:
+            by_seq[record['s']].update(response=record['out'], ms=record['ms'])
+    return requests
+
+
+def _replay_summary(entries: List[Dict], latencies: List[float], responses: List, elapsed: float) -> Dict:
+    by_command: Dict[str, Dict[str, List[float]]] = {}
+    changed = 0
+    for entry, latency, response in zip(entries, latencies, responses):
+        command = entry['message'].get('command', '?')
+        samples = by_command.setdefault(command, {'replayed': [], 'recorded': []})
+        samples['replayed'].append(latency)
+        if entry['ms'] is not None:
+            samples['recorded'].append(entry['ms'] / 1000)
+        if entry['response'] is not None and response != entry['response']:
+            changed += 1
+
+    def summary(samples: List[float]) -> Dict:
+        return {
+            'p50_ms': percentile(samples, 50) * 1000,
+            'p95_ms': percentile(samples, 95) * 1000,
+            'p99_ms': percentile(samples, 99) * 1000,
+        }
+
+    return {
+        'requests': len(latencies),
+        'elapsed_s': elapsed,
+        'requests_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'changed_responses': changed,
+        'commands': {
+            command: {'count': len(samples['replayed']), 'replayed': summary(samples['replayed']),
+                      'recorded': summary(samples['recorded'])}
+            for command, samples in by_command.items()
+        },
+    }
+
+
+def replay_into_bridge(entries: List[Dict], bridge, speed: float = 0.0) -> Dict:
+    """
+    Feed recorded requests to bridge.process_message one at a time.
+    speed 1.0 keeps the original gaps between requests, 2.0 halves them, 0 runs flat out.
+    """
+    latencies, responses = [], []
+    origin = entries[0]['t'] if entries else 0.0
+    start = time.perf_counter()
+    for entry in entries:
+        if speed:
+            delay = (entry['t'] - origin) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        sent = time.perf_counter()
+        responses.append(bridge.process_message(entry['message']))
+        latencies.append(time.perf_counter() - sent)
+    return _replay_summary(entries, latencies, responses, time.perf_counter() - start)
+
+
+async def _replay_over_socket(entries: List[Dict], host: str, port: int, speed: float) -> Dict:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({'command': 'handshake', 'framing': 'ndjson'}).encode())
+    await writer.drain()
+    if json.loads(await reader.read(4096)).get('status') != 'ok':
+        raise RuntimeError("Handshake rejected")
+
+    sent_at: Dict[int, float] = {}
+    latencies = [0.0] * len(entries)
+    responses = [None] * len(entries)
+
+    async def receive():
+        for _ in entries:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Bridge closed the connection")
+            response = json.loads(line)
+            index = response.pop('request_id')
+            latencies[index] = time.perf_counter() - sent_at[index]
+            responses[index] = response
+
+    receiver = asyncio.ensure_future(receive())
+    origin = entries[0]['t'] if entries else 0.0
+    start = time.perf_counter()
+    for index, entry in enumerate(entries):
+        if speed:
+            delay = (entry['t'] - origin) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        message = dict(entry['message'], request_id=index)  # Pipelined, open loop
+        sent_at[index] = time.perf_counter()
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+    await receiver
+    elapsed = time.perf_counter() - start
+    writer.close()
+    await writer.wait_closed()
+
+    return _replay_summary(entries, latencies, responses, elapsed)
+
+
+def bench_replay(path: str, target: str = None, speed: float = 0.0, latency: float = 0.0) -> Dict:
+    """
+    Replay a TrafficRecorder log into process_message (in this process, against
+    the stub collective) or over a socket to a running bridge at host:port.
+    """
+    entries = load_traffic(path)
+    if target:
+        host, _, port = target.rpartition(':')
+        result = asyncio.run(_replay_over_socket(entries, host or 'localhost', int(port), speed))
+    else:
+        from ue_bridge import UnrealBridge
+
+        logging.getLogger('ue_bridge').setLevel(logging.WARNING)
+        bridge = UnrealBridge(ue_project_path='.')
+        bridge.connect_consciousness(StubCollective(latency))
+        try:
+            result = replay_into_bridge(entries, bridge, speed)
+        finally:
+            bridge.stop()
+    result['config'] = {'path': path, 'target': target or 'process_message', 'speed': speed, 'latency': latency}
+    return result
+
+
+def write_report(benchmark: str, results, path: str):
+    """Write results with enough environment detail to compare runs across versions."""
+    report = {
+        'benchmark': benchmark,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if path == '-':
+        print(text)
+    else:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the UnrealBridge protocol without Unreal")
+    parser.add_argument('--modes', nargs='+', default=['thread', 'asyncio'])
+    parser.add_argument('--clients', type=int, default=32, help="concurrent simulated UE clients")
+    parser.add_argument('--requests', type=int, default=2000,
+                        help="total requests for the load run (decisions per batch-size run)")
+    parser.add_argument('--latency', type=float, default=0.0, help="stub consciousness latency in seconds")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="command weights, e.g. decision_request=4,input_received=1")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the command mix")
+    parser.add_argument('--json', nargs='?', const='-', metavar='PATH',
+                        help="write results as JSON to PATH (stdout if omitted)")
+    parser.add_argument('--connect', action='store_true', help="benchmark connect/request/close instead")
+    parser.add_argument('--connections', type=int, default=2000, help="total connections for --connect")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', help="benchmark decision batching instead")
+    parser.add_argument('--outbound', type=int, metavar='N', help="benchmark N pushes to UE instead")
+    parser.add_argument('--codecs', action='store_true', help="benchmark wire codecs instead")
+    parser.add_argument('--actors', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help="actors per game_state_update for --codecs")
+    parser.add_argument('--logging', action='store_true', help="benchmark logging overhead instead")
+    parser.add_argument('--datagram', type=float, nargs='*', metavar='LOSS',
+                        help="compare TCP and UDP pushes under simulated loss (default 0 0.01 0.05) instead")
+    parser.add_argument('--codegen', type=int, metavar='N', help="benchmark generating N character classes instead")
+    parser.add_argument('--concurrency', type=int, default=8, help="in-flight generations for --codegen/--batch")
+    parser.add_argument('--cache', type=int, metavar='N', help="benchmark a cold vs warm generation cache instead")
+    parser.add_argument('--stream', type=int, metavar='N',
+                        help="benchmark time-to-header for N classes, whole vs streamed completions, instead")
+    parser.add_argument('--pipeline', type=int, metavar='N',
+                        help="break generation of N characters/systems down by pipeline stage instead")
+    parser.add_argument('--batch', type=int, metavar='N', help="benchmark generate_batch over N specs instead")
+    parser.add_argument('--fail-rate', type=float, default=0.1, help="stub LM 503 rate for --batch")
+    parser.add_argument('--transports', action='store_true', help="compare TCP and shared memory latency instead")
+    parser.add_argument('--replay', metavar='PATH', help="replay a TrafficRecorder log instead")
+    parser.add_argument('--target', metavar='HOST:PORT', help="replay over a socket instead of process_message")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="replay speed: 1 keeps the recorded timing, 0 is as fast as possible")
+    args = parser.parse_args()
+
+    if args.pipeline:
+        benchmark = 'pipeline'
+        results = bench_pipeline(args.pipeline, args.latency or 0.2, args.concurrency)
+    elif args.stream:
+        benchmark = 'streaming'
+        results = bench_streaming(args.stream, args.latency or 1.0, args.concurrency)
+    elif args.cache:
+        benchmark = 'generation_cache'
+        results = bench_generation_cache(args.cache, args.latency or 0.2, args.concurrency)
+    elif args.batch:
+        benchmark = 'batch'
+        results = bench_batch(args.batch, args.latency or 0.05, args.concurrency, args.fail_rate)
+    elif args.codegen:
+        benchmark = 'codegen'
+        results = bench_codegen(args.codegen, args.latency or 0.05, args.concurrency)
+    elif args.datagram is not None:
+        benchmark, results = 'datagram', bench_datagram(losses=args.datagram or [0.0, 0.01, 0.05])
+    elif args.transports:
+        benchmark, results = 'transports', bench_transports(args.requests)
+    elif args.replay:
+        benchmark, results = 'replay', bench_replay(args.replay, args.target, args.speed, args.latency)
+    elif args.logging:
+        benchmark, results = 'logging', bench_logging(args.requests)
+    elif args.codecs:
+        benchmark, results = 'codecs', bench_codecs(args.actors)
+    elif args.outbound:
+        benchmark, results = 'outbound', bench_outbound(args.outbound)
+    elif args.batch_sizes:
+        benchmark = 'decision_batching'
+        results = [bench_decision_batching(size, args.requests, args.latency) for size in args.batch_sizes]
+    elif args.connect:
+        benchmark = 'connect'
+        results = [bench_server_mode(mode, args.clients, args.connections, args.latency) for mode in args.modes]
+    else:
+        benchmark = 'load'
+        results = [bench_load(mode, args.clients, args.requests, args.latency, args.mix, args.seed)
+                   for mode in args.modes]
+
+    if args.json:
+        write_report(benchmark, results, args.json)
+        if args.json == '-':
+            return
+
+    if benchmark == 'logging':
+        print(f"{'logging':<24}{'msgs/s':>12}{'relative':>10}")
+        for r in results:
+            print(f"{r['logging']:<24}{r['messages_per_sec']:>12.1f}{r['relative']:>10.2f}")
+    elif benchmark == 'pipeline':
+        print(f"{'kind':<12}{'stage':<10}{'count':>7}{'total s':>10}{'mean ms':>10}")
+        for r in results:
+            print(f"{r['kind']:<12}{r['stage']:<10}{r['count']:>7}{r['total_s']:>10.3f}{r['mean_ms']:>10.2f}")
+    elif benchmark == 'streaming':
+        print(f"{'mode':<10}{'classes':>9}{'header p50 s':>14}{'done p50 s':>12}{'total s':>10}{'events':>8}")
+        for r in results:
+            print(f"{r['mode']:<10}{r['classes']:>9}{r['header_p50_s']:>14.2f}{r['done_p50_s']:>12.2f}"
+                  f"{r['total_s']:>10.2f}{r['progress_events']:>8}")
+    elif benchmark == 'generation_cache':
+        print(f"{'cache':<12}{'classes':>8}{'total s':>10}{'first ms':>10}{'LM requests':>13}")
+        for r in results:
+            print(f"{r['cache']:<12}{r['classes']:>8}{r['total_s']:>10.3f}{r['first_ms']:>10.2f}{r['model_requests']:>13}")
+    elif benchmark == 'batch':
+        print(f"{'scheduler':<30}{'ok':>5}{'first s':>10}{'total s':>10}{'requests':>10}")
+        for r in results:
+            print(f"{r['scheduler']:<30}{r['succeeded']:>5}{r['first_s']:>10.2f}{r['total_s']:>10.2f}{r['requests']:>10}")
+    elif benchmark == 'codegen':
+        print(f"{'client':<30}{'classes':>8}{'seconds':>10}{'connections':>13}")
+        for r in results:
+            print(f"{r['client']:<30}{r['classes']:>8}{r['elapsed_s']:>10.2f}{r['connections']:>13}")
+    elif benchmark == 'datagram':
+        print(f"{'transport':<10}{'loss':>6}{'delivered':>11}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for r in results:
+            print(f"{r['transport']:<10}{r['loss']:>6.2f}{r['delivered']:>11}{r['p50_ms']:>10.2f}"
+                  f"{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}")
+    elif benchmark == 'transports':
+        print(f"{'transport':<16}{'requests':>10}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}")
+        for r in results:
+            print(f"{r['transport']:<16}{r['requests']:>10}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}{r['p99_us']:>10.1f}")
+    elif benchmark == 'replay':
+        print(f"{'command':<20}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'rec p50':>10}{'rec p99':>10}")
+        for command, c in results['commands'].items():
+            print(f"{command:<20}{c['count']:>8}{c['replayed']['p50_ms']:>10.2f}{c['replayed']['p99_ms']:>10.2f}"
+                  f"{c['recorded']['p50_ms']:>10.2f}{c['recorded']['p99_ms']:>10.2f}")
+        print(f"{results['requests']} requests, {results['requests_per_sec']:.1f} req/s, "
+              f"{results['changed_responses']} responses differ from the recording")
+    elif benchmark == 'codecs':
+        print(f"{'actors':<8}{'codec':<10}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+        for r in results:
+            print(f"{r['actors']:<8}{r['codec']:<10}{r['bytes']:>10}{r['encode_us']:>12.1f}{r['decode_us']:>12.1f}")
+    elif benchmark == 'outbound':
+        print(f"connect per message: {results['connect_per_message_us']:.1f} us/msg")
+        print(f"pooled channel:      {results['pooled_us']:.1f} us/msg  ({results['speedup']:.1f}x)")
+    elif benchmark == 'decision_batching':
+        print(f"{'batch':<8}{'decisions/s':>14}")
+        for r in results:
+            print(f"{r['batch_size']:<8}{r['decisions_per_sec']:>14.1f}")
+    elif benchmark == 'connect':
+        print(f"{'mode':<10}{'conn/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for r in results:
+            print(f"{r['mode']:<10}{r['connections_per_sec']:>12.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+    else:
+        print(f"{'mode':<10}{'command':<20}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for r in results:
+            mode = r['config']['mode']
+            for command, c in r['commands'].items():
+                print(f"{mode:<10}{command:<20}{c['count']:>8}{c['p50_ms']:>10.2f}{c['p95_ms']:>10.2f}"
+                      f"{c['p99_ms']:>10.2f}{c['errors']:>8}")
+            print(f"{mode:<10}{'all':<20}{r['count']:>8}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                  f"{r['p99_ms']:>10.2f}{r['errors']:>8}   {r['requests_per_sec']:.1f} req/s")
+
+
+if __name__ == '__main__':
+    main()